@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_store import iter_records
+from tagging import KEYWORDS, TagMatcher
+
+# Compara el extractor de tags compilado (tagging.TagMatcher) con la versión
+# original, que recorre el texto una vez por palabra clave, sobre los mensajes
+# de commit y títulos de issues y PRs guardados en evaluation/.
+#
+#   python benchmarks/bench_extract_tags.py --repeat 20
+
+
+def naive_extract_tags(text):
+    tags = set()
+    text = text.lower()
+    for tag, words in KEYWORDS.items():
+        if any(word in text for word in words):
+            tags.add(tag)
+    return tags
+
+
+def load_corpus(evaluation_dir):
+    texts = []
+    for name in sorted(os.listdir(evaluation_dir)):
+        folder = os.path.join(evaluation_dir, name)
+        if not os.path.isdir(folder):
+            continue
+        texts += [c.get('commit', {}).get('message', '') for c in iter_records(folder, 'commits')]
+        texts += [i.get('title', '') for i in iter_records(folder, 'issues')]
+        texts += [pr.get('title', '') for pr in iter_records(folder, 'pulls')]
+    return texts
+
+
+def best_time(fn, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de extract_tags")
+    parser.add_argument('--evaluation', default='evaluation', help="Carpeta con los forks")
+    parser.add_argument('--repeat', type=int, default=10, help="Repeticiones (se toma la mejor)")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.evaluation)
+    matcher = TagMatcher()
+    bounded = TagMatcher(word_boundary=True)
+
+    mismatches = sum(naive_extract_tags(text) != matcher.extract(text) for text in texts)
+    if mismatches:
+        sys.exit(f"❌ El extractor compilado difiere del original en {mismatches} textos")
+
+    print(f"Corpus: {len(texts)} textos, {sum(map(len, texts))} caracteres")
+    results = [(label, best_time(fn, texts, args.repeat)) for label, fn in [
+        ('original (subcadenas)', naive_extract_tags),
+        ('compilado', matcher.extract),
+        ('compilado, palabras completas', bounded.extract),
+    ]]
+    baseline = results[0][1]
+    for label, elapsed in results:
+        print(f"{label:32} {elapsed * 1000:8.2f} ms  "
+              f"{elapsed / len(texts) * 1e6:6.2f} µs/texto  x{baseline / elapsed:.2f}")
+
+    changed = sum(matcher.extract(text) != bounded.extract(text) for text in texts)
+    print(f"Con palabras completas cambian los tags de {changed} textos")
+
+
+if __name__ == '__main__':
+    main()
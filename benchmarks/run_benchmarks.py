@@ -0,0 +1,284 @@
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from synthetic_forks import generate
+from record_store import iter_records
+from tagging import TagMatcher
+from feature_resolver import FeatureResolver
+from feature_inventory import features_from_data
+from feedback_store import FeedbackLog, store_path
+from feedback_cube import FeedbackCube
+from feedback_questions import QuestionEngine, load_questions
+
+# Benchmark de todas las etapas del pipeline sobre forks sintéticos
+# (synthetic_forks.py): extracción de tags, inventario de features, resolución
+# ruta → feature, traceability maps (paso 2), feedback log (paso 3), agregados
+# y gráficas (report.py). De cada etapa se mide el mejor tiempo de --repeat
+# ejecuciones, el rendimiento (elementos por segundo) y el pico de memoria
+# (tracemalloc, en una ejecución aparte). Los resultados se guardan en JSON
+# para comparar versiones con --compare.
+#
+#   python benchmarks/run_benchmarks.py --forks 20 --commits 500 --files 5
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/abc1234.json
+
+STAGES = ('tagging', 'feature_inventory', 'feature_resolution', 'traceability_map',
+          'feedback_log', 'aggregation', 'charts')
+
+UNITS = {
+    'tagging': 'textos',
+    'feature_inventory': 'registros',
+    'feature_resolution': 'rutas',
+    'traceability_map': 'registros',
+    'feedback_log': 'filas',
+    'aggregation': 'filas',
+    'charts': 'gráficas',
+}
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+# Forks sintéticos y todo lo que las etapas necesitan ya preparado, para que
+# solo se mida la etapa
+class Workspace:
+    def __init__(self, path, scale):
+        self.path = path
+        self.evaluation_dir = os.path.join(path, 'evaluation')
+        self.output = os.path.join(path, 'feedback_log.json')
+        self.forks = generate(path, **scale)
+        self.folders = [os.path.join(self.evaluation_dir, entry['repo'].replace('/', '#')) for entry in self.forks]
+        self.texts = []
+        self.paths = {}
+        self.records = 0
+        self.file_records = 0
+        for folder in self.folders:
+            commits = list(iter_records(folder, 'commits'))
+            issues = list(iter_records(folder, 'issues'))
+            pulls = list(iter_records(folder, 'pulls'))
+            self.records += len(commits) + len(issues) + len(pulls)
+            self.file_records += len(commits) + len(pulls)
+            self.texts += [c['commit']['message'] for c in commits]
+            self.texts += [record['title'] for record in issues + pulls]
+            self.paths[folder] = [[f['filename'] for f in record['files']] for record in commits + pulls]
+        # Las gráficas leen estos ficheros del directorio de trabajo
+        shutil.copy(os.path.join(ROOT, 'questions.json'), path)
+
+
+def stage_tagging(ws):
+    matcher = TagMatcher()
+    for text in ws.texts:
+        matcher.extract(text)
+    return len(ws.texts)
+
+
+def stage_feature_inventory(ws):
+    for folder in ws.folders:
+        features_from_data(folder, refresh=True)
+    return ws.file_records
+
+
+def stage_feature_resolution(ws):
+    paths = 0
+    for folder in ws.folders:
+        resolver = FeatureResolver(features_from_data(folder))
+        for files in ws.paths[folder]:
+            resolver.features(files)
+            paths += len(files)
+    return paths
+
+
+def stage_traceability_map(ws, jobs=1):
+    from evaluation_02_data_processing import process_forks
+    process_forks(ws.forks, ws.evaluation_dir, jobs)
+    return ws.records
+
+
+def stage_feedback_log(ws):
+    from evaluation_03_generate_feedback_log import build_feedback_log
+    build_feedback_log(ws.evaluation_dir, ws.output, rebuild=True)
+    shutil.copy(ws.output, os.path.join(ws.path, 'feedback_log_anonymous.json'))
+    return len(FeedbackLog.load(store_path(ws.output)))
+
+
+def stage_aggregation(ws):
+    log = FeedbackLog.load(store_path(ws.output))
+    cube = FeedbackCube.from_log(log)
+    questions = load_questions(os.path.join(ws.path, 'questions.json'))
+    all_questions = [q for section in questions['analysis'] for q in section['questions']] + questions['charts']
+    engine = QuestionEngine(cube, all_questions)
+    for index in range(len(all_questions)):
+        engine.ranking(index)
+    cube.counters('feature', 'month')
+    cube.frame('month', 'tag')
+    return len(log)
+
+
+def stage_charts(ws):
+    import report
+    report.build_report(force=True)
+    return len(report.CHARTS)
+
+
+def run_stage(name, ws, jobs):
+    if name == 'traceability_map':
+        return stage_traceability_map(ws, jobs)
+    return globals()[f'stage_{name}'](ws)
+
+
+# Ejecuta la etapa con la salida silenciada (barras de progreso, mensajes de
+# cada gráfica) y en el directorio de trabajo
+def quiet_run(name, ws, jobs):
+    cwd = os.getcwd()
+    os.chdir(ws.path)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            return run_stage(name, ws, jobs)
+    finally:
+        os.chdir(cwd)
+
+
+def measure(name, ws, repeat, jobs, memory):
+    best = float('inf')
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = quiet_run(name, ws, jobs)
+        best = min(best, time.perf_counter() - start)
+    result = {
+        'seconds': round(best, 4),
+        'items': items,
+        'unit': UNITS[name],
+        'throughput': round(items / best, 1) if best else None,
+        'peak_memory_mb': None,
+    }
+    if memory:
+        tracemalloc.start()
+        quiet_run(name, ws, jobs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_mb'] = round(peak / 2 ** 20, 2)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"\n{'etapa':20} {'tiempo':>9} {'rendimiento':>22} {'memoria':>10}")
+    for name, stage in results['stages'].items():
+        memory = f"{stage['peak_memory_mb']:.1f} MB" if stage['peak_memory_mb'] is not None else '-'
+        throughput = f"{stage['throughput']:,.1f} {stage['unit']}/s"
+        print(f"{name:20} {stage['seconds']:8.3f}s {throughput:>22} {memory:>10}")
+
+
+# Compara con unos resultados anteriores. Devuelve las etapas más lentas que
+# el umbral (tiempo nuevo / tiempo anterior)
+def compare(results, baseline, threshold):
+    if baseline.get('scale') != results['scale']:
+        print("⚠️  Los resultados anteriores son de otra escala; la comparación es orientativa")
+    print(f"\nComparación con {baseline.get('label')} (umbral x{threshold}):")
+    regressions = []
+    for name, stage in results['stages'].items():
+        old = baseline['stages'].get(name)
+        if not old:
+            continue
+        ratio = stage['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        mark = '❌' if ratio > threshold else '✅'
+        print(f"{mark} {name:20} {old['seconds']:8.3f}s → {stage['seconds']:8.3f}s  x{ratio:.2f}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de las etapas del pipeline con forks sintéticos")
+    parser.add_argument('--forks', type=int, default=20, help="Número de forks")
+    parser.add_argument('--commits', type=int, default=200, help="Commits por fork")
+    parser.add_argument('--issues', type=int, default=100, help="Issues por fork")
+    parser.add_argument('--pulls', type=int, default=50, help="PRs por fork")
+    parser.add_argument('--files', type=float, default=5.0, help="Media de archivos por commit")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla del generador")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help="Etapas a medir (en orden)")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por etapa (se toma la mejor)")
+    parser.add_argument('--jobs', type=int, default=1, help="Procesos para el paso 2")
+    parser.add_argument('--no-memory', action='store_true', help="No medir el pico de memoria")
+    parser.add_argument('--workdir', help="Carpeta para los datos sintéticos (temporal por defecto, se borra al acabar)")
+    parser.add_argument('--label', help="Nombre de los resultados (por defecto, el commit actual)")
+    parser.add_argument('--output', help="Fichero JSON de resultados (por defecto benchmarks/results/<label>.json)")
+    parser.add_argument('--compare', help="Resultados anteriores con los que comparar")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Ratio de tiempo a partir del cual una etapa es una regresión")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    scale = {'forks': args.forks, 'commits': args.commits, 'issues': args.issues,
+             'pulls': args.pulls, 'files_per_commit': args.files, 'seed': args.seed}
+    workdir = args.workdir or tempfile.mkdtemp(prefix='feedback-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    revision = git_revision()
+    label = args.label or revision or 'local'
+
+    try:
+        start = time.perf_counter()
+        ws = Workspace(workdir, scale)
+        print(f"🧪 {args.forks} forks sintéticos, {ws.records} registros, "
+              f"generados en {time.perf_counter() - start:.2f}s ({workdir})")
+        # Las etapas dependen de las anteriores (el log sale de los traceability
+        # maps, las gráficas del log), así que se ejecutan en el orden del pipeline
+        stages = {}
+        for name in [stage for stage in STAGES if stage in args.stages]:
+            stages[name] = measure(name, ws, args.repeat, args.jobs, not args.no_memory)
+            print(f"⏱️  {name}: {stages[name]['seconds']:.3f}s")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'label': label,
+        'revision': revision,
+        'created': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'scale': scale,
+        'repeat': args.repeat,
+        'jobs': args.jobs,
+        'stages': stages,
+    }
+    print_results(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{label}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Resultados guardados en {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"❌ Regresiones en: {', '.join(regressions)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import os
+import sys
+import json
+import math
+import random
+import argparse
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_store import jsonl_path, write_records
+
+# Generador de forks sintéticos para los benchmarks. Escribe commits, issues y
+# PRs con los campos de la proyección slim (lo que guarda el paso 1) en
+# <salida>/evaluation/<owner>#<repo>/*.jsonl, más un forks.json con la lista.
+# Las proporciones imitan los datos reales de evaluation/: ~62 % de los
+# archivos bajo app/modules/<feature>/, features con el peso que tienen en el
+# proyecto, archivos por commit con cola larga (la mediana queda muy por debajo
+# de la media), una etiqueta por issue y fechas entre octubre de 2024 y abril
+# de 2025.
+#
+#   python benchmarks/synthetic_forks.py /tmp/bench --forks 20 --commits 500 --files 5
+
+# Peso de cada feature (archivos tocados bajo app/modules/<feature>/ en los datos reales)
+FEATURE_WEIGHTS = {
+    'dataset': 807, 'auth': 302, 'explore': 284, 'fakenodo': 216, 'profile': 187,
+    'notepad': 125, 'zenodo': 115, 'hubfile': 111, 'flamapy': 81, 'featuremodel': 78,
+    'webhook': 63, 'rating': 62, 'public': 59, 'telegram_bot': 45, 'mail': 31,
+    'validatemail': 28, 'team': 20,
+}
+MODULE_SHARE = 0.62
+MODULE_FILES = ['routes.py', 'models.py', 'services.py', 'repositories.py', 'forms.py',
+                'tests/test_unit.py', 'tests/test_selenium.py', 'templates/{f}/index.html',
+                'assets/scripts.js', '__init__.py']
+OTHER_FILES = ['.github/workflows/tests.yml', '.github/workflows/deploy.yml', 'core/configuration/configuration.py',
+               'core/blueprints/base_blueprint.py', 'rosemary/commands/db_seed.py', 'docker/docker-compose.dev.yml',
+               'migrations/versions/{n:04d}_migration.py', 'requirements.txt', 'README.md', 'app/__init__.py']
+
+# Prefijos y vocabulario de los mensajes; algunas palabras son palabras clave
+# de tagging.KEYWORDS y otras no, con una frecuencia parecida a la real
+PREFIXES = {'feat': 35, 'fix': 20, 'test': 10, 'refactor': 5, 'docs': 10, 'chore': 10, '': 10}
+WORDS = ['add', 'update', 'view', 'page', 'button', 'form', 'route', 'template', 'user', 'download',
+         'upload', 'search', 'filter', 'login', 'style', 'readme', 'workflow', 'merge', 'branch', 'improve',
+         'dashboard', 'navbar', 'logo', 'footer', 'header', 'card', 'typo', 'link', 'icon', 'avatar',
+         'profile', 'layout', 'message', 'email', 'table', 'list', 'modal', 'paginate', 'sort', 'show',
+         'test', 'bug', 'error', 'config', 'model', 'mock', 'remove', 'setup', 'schema', 'deprecated',
+         'integration', 'unit', 'extend', 'restructure']
+LABELS = {'bug': 289, 'enhancement': 242, 'test': 198, 'high': 95, 'documentation': 86, 'WI': 84,
+          'M3': 81, 'feature': 74, 'help wanted': 73, 'code': 67, 'fix': 57, 'backend': 56}
+# Parte de las etiquetas que son el nombre de una feature
+FEATURE_LABEL_SHARE = 0.15
+
+START_DATE = datetime(2024, 10, 15, tzinfo=timezone.utc)
+END_DATE = datetime(2025, 4, 1, tzinfo=timezone.utc)
+
+
+def fake_sha(*parts):
+    return hashlib.sha1('/'.join(map(str, parts)).encode()).hexdigest()
+
+
+def iso(date):
+    return date.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ForkGenerator:
+    def __init__(self, seed=0, files_per_commit=5.0):
+        self.random = random.Random(seed)
+        self.features = list(FEATURE_WEIGHTS)
+        self.feature_weights = list(FEATURE_WEIGHTS.values())
+        # Lognormal con la media pedida y cola larga, como en los datos reales
+        self.sigma = 1.5
+        self.mu = math.log(max(files_per_commit, 1.0)) - self.sigma ** 2 / 2
+
+    def pick(self, weights):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def message(self):
+        prefix = self.pick(PREFIXES)
+        body = ' '.join(self.random.choices(WORDS, k=self.random.randint(2, 7)))
+        return f'{prefix}: {body}' if prefix else body
+
+    def file_count(self):
+        return max(1, min(300, int(self.random.lognormvariate(self.mu, self.sigma) + 0.5)))
+
+    def path(self, fork_features):
+        if self.random.random() < MODULE_SHARE:
+            feature = self.random.choice(fork_features)
+            name = self.random.choice(MODULE_FILES).format(f=feature)
+            return f'app/modules/{feature}/{name}'
+        return self.random.choice(OTHER_FILES).format(n=self.random.randrange(200))
+
+    def files(self, fork_features, count):
+        return [{'filename': self.path(fork_features)} for _ in range(count)]
+
+    def dates(self, count):
+        span = (END_DATE - START_DATE).total_seconds()
+        offsets = sorted((self.random.random() * span for _ in range(count)), reverse=True)
+        return [START_DATE + timedelta(seconds=int(offset)) for offset in offsets]
+
+    # Cada fork usa una parte de las features, siempre con las más comunes
+    def fork_features(self):
+        count = self.random.randint(max(3, len(self.features) // 2), len(self.features))
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(self.random.choices(self.features, weights=self.feature_weights)[0])
+        weighted = [f for f in self.features if f in chosen]
+        return self.random.choices(weighted, weights=[FEATURE_WEIGHTS[f] for f in weighted], k=200)
+
+    def commits(self, fork, fork_features, count):
+        records = []
+        for index, date in enumerate(self.dates(count)):
+            sha = fake_sha(fork, 'commit', index)
+            records.append({
+                'sha': sha,
+                'commit': {'message': self.message(),
+                           'author': {'date': iso(date)},
+                           'committer': {'date': iso(date)}},
+                'files': self.files(fork_features, self.file_count()),
+                'parents': [{'sha': fake_sha(fork, 'commit', index + 1)}] if index + 1 < count else [],
+            })
+        return records
+
+    def labels(self, fork_features):
+        if self.random.random() < FEATURE_LABEL_SHARE:
+            return [{'name': self.random.choice(fork_features)}]
+        return [{'name': self.pick(LABELS)}]
+
+    def issues(self, fork_features, count):
+        return [{
+            'number': count - index,
+            'title': self.message(),
+            'labels': self.labels(fork_features),
+            'created_at': iso(date),
+            'updated_at': iso(date),
+        } for index, date in enumerate(self.dates(count))]
+
+    def pulls(self, fork, fork_features, count, first_number):
+        records = []
+        for index, date in enumerate(self.dates(count)):
+            number = first_number + count - index
+            merged = self.random.random() < 0.8
+            records.append({
+                'number': number,
+                'title': self.message(),
+                'labels': [],
+                'created_at': iso(date),
+                'updated_at': iso(date),
+                'merged_at': iso(date + timedelta(hours=2)) if merged else None,
+                'merge_commit_sha': fake_sha(fork, 'merge', number) if merged else None,
+                'head': {'sha': fake_sha(fork, 'head', number)},
+                'base': {'sha': fake_sha(fork, 'base', number)},
+                'files': self.files(fork_features, self.file_count() + 1),
+            })
+        return records
+
+
+# Genera los forks en <output>/evaluation y devuelve la lista de forks.json
+def generate(output, forks=20, commits=200, issues=100, pulls=50, files_per_commit=5.0, seed=0):
+    generator = ForkGenerator(seed, files_per_commit)
+    evaluation_dir = os.path.join(output, 'evaluation')
+    entries = []
+    for index in range(forks):
+        owner, repo = f'synthetic-{index:03d}', f'hub-{index:03d}'
+        folder = os.path.join(evaluation_dir, f'{owner}#{repo}')
+        os.makedirs(folder, exist_ok=True)
+        fork_features = generator.fork_features()
+        write_records(jsonl_path(folder, 'commits'), generator.commits(repo, fork_features, commits))
+        write_records(jsonl_path(folder, 'issues'), generator.issues(fork_features, issues))
+        write_records(jsonl_path(folder, 'pulls'), generator.pulls(repo, fork_features, pulls, issues))
+        entries.append({'repo': f'{owner}/{repo}'})
+    with open(os.path.join(output, 'forks.json'), 'w') as f:
+        json.dump(entries, f, indent=2)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera forks sintéticos para los benchmarks")
+    parser.add_argument('output', help="Carpeta de salida (se crea evaluation/ y forks.json dentro)")
+    parser.add_argument('--forks', type=int, default=20, help="Número de forks")
+    parser.add_argument('--commits', type=int, default=200, help="Commits por fork")
+    parser.add_argument('--issues', type=int, default=100, help="Issues por fork")
+    parser.add_argument('--pulls', type=int, default=50, help="PRs por fork")
+    parser.add_argument('--files', type=float, default=5.0, help="Media de archivos por commit")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla (misma semilla, mismos datos)")
+    args = parser.parse_args()
+    entries = generate(args.output, args.forks, args.commits, args.issues, args.pulls, args.files, args.seed)
+    print(f"✅ {len(entries)} forks sintéticos generados en {os.path.join(args.output, 'evaluation')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+from functools import lru_cache
+from record_store import iter_records
+
+# Bases distintas cuyos antecesores se conservan calculados
+ANCESTOR_MEMO = 16
+
+
+# Índice por sha de los commits ya guardados con sus archivos (commits.jsonl).
+# Permite sacar los archivos de una PR sin pedir /pulls/{n}/files, pero solo
+# cuando dos fuentes independientes coinciden:
+#
+#   - la PR se fusionó con un merge commit (dos padres, el segundo su head)
+#     que está en el índice: sus archivos respecto al primer padre, y
+#   - el recorrido de los antecesores del head hasta llegar a los de la base
+#     (ancestros(head) − ancestros(base)): la unión de los archivos de esos
+#     commits, sin los merges intermedios (traerían archivos de otras PRs).
+#
+# Por separado ninguna de las dos es siempre la lista de la PR: el merge
+# commit solo muestra lo que la PR añade sobre la base, y la unión incluye
+# archivos que luego se revierten. Si no coinciden, si falta algún commit del
+# recorrido o alguno tiene la lista truncada, la PR no se resuelve aquí y hay
+# que pedirla a la API.
+class CommitIndex:
+    def __init__(self, commits=()):
+        self.parents = {}
+        self.files = {}
+        for commit in commits:
+            self.add(commit)
+        self.ancestors = lru_cache(maxsize=ANCESTOR_MEMO)(self._ancestors)
+
+    @classmethod
+    def from_folder(cls, folder):
+        return cls(iter_records(folder, 'commits'))
+
+    def __len__(self):
+        return len(self.files)
+
+    # Solo se indexan commits con la lista de archivos completa
+    def add(self, commit):
+        if 'files' not in commit or commit.get('files_truncated'):
+            return
+        sha = commit['sha']
+        self.parents[sha] = tuple(parent['sha'] for parent in commit.get('parents', []))
+        self.files[sha] = tuple(f['filename'] for f in commit['files'])
+
+    def __contains__(self, sha):
+        return sha in self.files
+
+    # sha y todos sus antecesores del índice
+    def _ancestors(self, sha):
+        seen = set()
+        stack = [sha]
+        while stack:
+            current = stack.pop()
+            if current in seen or current not in self.parents:
+                continue
+            seen.add(current)
+            stack.extend(self.parents[current])
+        return frozenset(seen)
+
+    # Commits de head que no están en base, o None si el recorrido sale del índice
+    def branch_commits(self, head, base):
+        if head not in self or base not in self:
+            return None
+        stop = self.ancestors(base)
+        commits = []
+        seen = set()
+        stack = [head]
+        while stack:
+            current = stack.pop()
+            if current in seen or current in stop:
+                continue
+            if current not in self:
+                return None
+            seen.add(current)
+            commits.append(current)
+            stack.extend(self.parents[current])
+        return commits
+
+    # Archivos de una PR en el formato de /pulls/{n}/files, o None si no se
+    # pueden confirmar con los commits del índice
+    def pull_files(self, pr):
+        head = (pr.get('head') or {}).get('sha')
+        base = (pr.get('base') or {}).get('sha')
+        merge = pr.get('merge_commit_sha')
+        if merge not in self or self.parents[merge][1:2] != (head,):
+            return None
+        commits = self.branch_commits(head, base)
+        if commits is None:
+            return None
+        branch = {name for sha in commits if len(self.parents[sha]) < 2 for name in self.files[sha]}
+        if branch != set(self.files[merge]):
+            return None
+        return [{'filename': name} for name in dict.fromkeys(self.files[merge])]
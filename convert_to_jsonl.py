@@ -0,0 +1,37 @@
+import os
+import argparse
+import logging
+from tqdm import tqdm
+from record_store import convert_folder
+from projection import Projection, project_folder
+
+# Configuración del log
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Convierte los volcados evaluation/*/{commits,issues,pulls}.json a JSON Lines
+def main():
+    parser = argparse.ArgumentParser(description="Convierte los volcados de cada fork a JSON Lines")
+    parser.add_argument('folders', nargs='*', help="Carpetas de fork (por defecto, todas las de evaluation/)")
+    parser.add_argument('--evaluation', default='evaluation', help="Carpeta con los forks")
+    parser.add_argument('--remove', action='store_true', help="Borra los .json originales tras convertirlos")
+    parser.add_argument('--slim', action='store_true',
+                        help="Deja solo los campos que usan los pasos siguientes (ver projection.py)")
+    args = parser.parse_args()
+
+    folders = args.folders or sorted(
+        os.path.join(args.evaluation, name) for name in os.listdir(args.evaluation)
+        if os.path.isdir(os.path.join(args.evaluation, name))
+    )
+    projection = Projection('slim') if args.slim else None
+    converted = 0
+    for folder in tqdm(folders, desc="Convirtiendo forks"):
+        converted += len(convert_folder(folder, remove=args.remove))
+        if projection:
+            project_folder(folder, projection)
+    logging.info(f"✅ {converted} ficheros convertidos en {len(folders)} forks")
+
+if __name__ == '__main__':
+    main()
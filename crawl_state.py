@@ -0,0 +1,57 @@
+import os
+import json
+from datetime import datetime, timedelta, timezone
+from record_store import iter_jsonl
+
+# Estado incremental de cada fork: marcas de agua (high-water marks) y ETags
+# de los listados, guardados en evaluation/<owner>#<repo>/checkpoint.json
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+def load_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+# Escribe en un fichero temporal y lo renombra: un fallo a mitad de escritura
+# nunca deja un JSON corrupto
+def write_json_atomic(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(folder):
+    return load_json(os.path.join(folder, CHECKPOINT_FILE), {})
+
+
+def save_checkpoint(folder, state):
+    write_json_atomic(os.path.join(folder, CHECKPOINT_FILE), state)
+
+
+def shift_date(date, days):
+    dt = datetime.fromisoformat(date.replace('Z', '+00:00')) + timedelta(days=days)
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+# Recorre en streaming los registros ya guardados y devuelve la versión
+# (updated_at) de cada clave, los registros que aún no tienen 'files' y la
+# fecha más reciente, que sirve de marca si no hay checkpoint
+def scan_existing(path, key, get_date, needs_files=False):
+    versions = {}
+    pending = {}
+    latest = None
+    if os.path.exists(path):
+        for record in iter_jsonl(path):
+            versions[record[key]] = record.get('updated_at')
+            if needs_files and 'files' not in record:
+                pending[record[key]] = record
+            else:
+                pending.pop(record[key], None)
+            date = get_date(record)
+            if date and (latest is None or date > latest):
+                latest = date
+    return versions, list(pending.values()), latest
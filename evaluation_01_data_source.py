@@ -1,8 +1,19 @@
 import os
+import sys
 import json
-import requests
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 import logging
+from github_client import GitHubClient, GitHubError, MAX_CONCURRENCY, FILES_LIMIT, FILES_PER_PAGE
+import github_graphql
+import git_backend
+from git_backend import GitMirrors, GitError
+from crawl_state import load_checkpoint, save_checkpoint, shift_date, scan_existing
+from record_store import RECORD_TYPES, jsonl_path, legacy_path, compact, convert_folder, repair_tail
+from projection import Projection, PROJECTIONS, archive_path
+from commit_index import CommitIndex
 
 # Configuración del log
 logging.basicConfig(
@@ -10,90 +21,373 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Token de GitHub
-GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-HEADERS = {
-    'Authorization': f'token {GITHUB_TOKEN}',
-    'Accept': 'application/vnd.github.v3+json'
-}
-
-# Función para obtener todos los resultados paginados
-def fetch_all_pages(url):
-    results = []
-    while url:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            logging.warning(f"❌ Error al obtener datos: {response.status_code} - {url}")
-            break
-        results.extend(response.json())
-        # Verificar si hay siguiente página
-        if 'Link' in response.headers:
-            links = response.headers['Link']
-            next_link = None
-            for link in links.split(','):
-                if 'rel="next"' in link:
-                    next_link = link[link.find('<') + 1:link.find('>')]
-                    break
-            url = next_link
-        else:
-            url = None
-    return results
+# Guarda la lista de archivos; si GitHub la ha truncado se marca el registro
+def set_files(record, files, truncated, label):
+    record['files'] = files
+    if truncated:
+        record['files_truncated'] = True
+        logging.warning(f"⚠️  {label} llega al límite de {FILES_LIMIT} archivos: la lista puede estar incompleta")
 
-# Función para obtener archivos de un commit
-def enrich_commits_with_files(owner, repo, commits):
-    for commit in tqdm(commits, desc="Añadiendo archivos a commits"):
+# Función para obtener archivos de un commit (todas sus páginas)
+def enrich_commits_with_files(client, owner, repo, commits):
+    def fetch_files(commit):
         sha = commit.get('sha')
-        url = f'https://api.github.com/repos/{owner}/{repo}/commits/{sha}'
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code == 200:
-            commit['files'] = response.json().get('files', [])
-        else:
-            logging.warning(f"⚠️  Error al obtener archivos del commit {sha}")
+        try:
+            set_files(commit, *client.fetch_files(f'repos/{owner}/{repo}/commits/{sha}'), f"El commit {sha}")
+        except GitHubError as e:
+            # Sin 'files', el commit queda pendiente para la siguiente ejecución
+            logging.warning(f"⚠️  Error al obtener archivos del commit {sha}: {e}")
+
+    client.map(fetch_files, commits, desc=f"Añadiendo archivos a commits ({repo})")
     return commits
 
-# Función para obtener archivos de cada PR
-def enrich_pulls_with_files(owner, repo, pulls):
-    for pr in tqdm(pulls, desc="Añadiendo archivos a PRs"):
+# Función para obtener archivos de cada PR (páginas de 100, pedidas a la vez)
+def enrich_pulls_with_files(client, owner, repo, pulls):
+    def fetch_files(pr):
         number = pr.get('number')
-        url = f'https://api.github.com/repos/{owner}/{repo}/pulls/{number}/files'
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code == 200:
-            pr['files'] = response.json()
-        else:
-            logging.warning(f"⚠️  Error al obtener archivos del PR #{number}")
+        try:
+            set_files(pr, *client.fetch_files(f'repos/{owner}/{repo}/pulls/{number}/files',
+                                              {'per_page': FILES_PER_PAGE}), f"El PR #{number}")
+        except GitHubError as e:
+            logging.warning(f"⚠️  Error al obtener archivos del PR #{number}: {e}")
+
+    client.map(fetch_files, pulls, desc=f"Añadiendo archivos a PRs ({repo})")
     return pulls
 
-# Leer forks.json
-with open('forks2.json', 'r') as f:
-    forks = json.load(f)
+# Archivos de las PRs a partir de los commits ya guardados (commit_index.py).
+# Devuelve las PRs que no se han podido resolver y hay que pedir a la API
+def files_from_commits(index, pulls):
+    pending = []
+    for pr in pulls:
+        files = index.pull_files(pr)
+        if files is None:
+            pending.append(pr)
+        else:
+            pr['files'] = files
+    if len(pending) < len(pulls):
+        logging.info(f"🔗 {len(pulls) - len(pending)}/{len(pulls)} PRs con archivos sacados de sus commits")
+    return pending
+
+# Registros por bloque al leer de GraphQL (las páginas REST ya vienen de 100)
+PAGE_SIZE = 100
+
+# Margen hacia atrás al usar `since` en commits: los commits de una rama que se
+# fusiona tarde conservan su fecha original
+SINCE_OVERLAP_DAYS = 14
+
+def commit_date(commit):
+    return commit.get('commit', {}).get('committer', {}).get('date')
+
+def updated_date(record):
+    return record.get('updated_at')
+
+def newest(dates):
+    dates = [d for d in dates if d]
+    return max(dates) if dates else None
+
+def batched(records, size=PAGE_SIZE):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# Páginas de un listado REST pedido de forma condicional, reutilizando el
+# ETag si la URL no ha cambiado desde la última ejecución
+def listing_pages(client, state, name, url, stop=None):
+    previous = state.get(name, {})
+    etag = previous.get('etag') if previous.get('url') == url else None
+    return client.iter_pages(url, etag=etag, stop=stop)
+
+# Vuelca los registros nuevos o modificados de cada página según llegan
+# (enriquecidos si hace falta) al final del .jsonl. Las versiones antiguas se
+# eliminan al compactar cuando la etapa termina. Devuelve (listados, escritos)
+def sync_pages(folder, state, name, key, pages, projection, enrich=None, needs_files=False):
+    path = jsonl_path(folder, name)
+    stage = state.setdefault(name, {})
+    if stage.get('dirty'):
+        # Una ejecución anterior se interrumpió antes de compactar
+        compact(path, key)
+    else:
+        # Nunca se añade detrás de una línea a medias
+        repair_tail(path)
+    versions, pending, _ = scan_existing(path, key, lambda record: None, needs_files)
+    # El fichero existe aunque el listado esté vacío, como el [] de antes
+    open(path, 'a').close()
+
+    listed = written = 0
+    for page in pages:
+        listed += len(page)
+        changed = [r for r in page if r[key] not in versions or versions[r[key]] != r.get('updated_at')]
+        # Los registros del listado sustituyen a los pendientes de la ejecución anterior
+        changed_keys = {r[key] for r in changed}
+        pending = [r for r in pending if r[key] not in changed_keys]
+        written += write_batch(folder, state, name, changed, projection, enrich)
+        versions.update((r[key], r.get('updated_at')) for r in changed)
+
+    # Registros que se quedaron sin archivos en una ejecución anterior
+    for batch in batched(pending):
+        written += write_batch(folder, state, name, batch, projection, enrich)
+
+    if stage.get('dirty'):
+        compact(path, key)
+        stage['dirty'] = False
+    return listed, written
+
+def write_batch(folder, state, name, records, projection, enrich):
+    if not records:
+        return 0
+    if enrich:
+        enrich(records)
+    if not state[name].get('dirty'):
+        state[name]['dirty'] = True
+        save_checkpoint(folder, state)
+    projection.write(folder, name, records)
+    return len(records)
+
+def stage_mark(folder, state, name, field, key, get_date):
+    mark = state.get(name, {}).get(field)
+    if mark:
+        return mark
+    # Sin checkpoint, la marca sale de los datos ya guardados
+    return scan_existing(jsonl_path(folder, name), key, get_date)[2]
+
+def collect_commits(client, owner, repo, folder, state, projection, gql=None, git=None, entry=None):
+    mark = stage_mark(folder, state, 'commits', 'since', 'sha', commit_date)
+    since = shift_date(mark, -SINCE_OVERLAP_DAYS) if mark else None
+    latest = [mark]
+
+    if git:
+        return collect_commits_from_git(git, entry, owner, repo, folder, state, projection, latest)
+    if gql:
+        url = None
+        pages = batched(github_graphql.fetch_commits(gql, owner, repo, since))
+    else:
+        url = f'repos/{owner}/{repo}/commits?per_page=100'
+        if since:
+            url += f'&since={since}'
+        pages = listing_pages(client, state, 'commits', url)
+
+    def enrich(commits):
+        # Los archivos de cada commit solo están disponibles por REST
+        enrich_commits_with_files(client, owner, repo, commits)
+        latest.extend(commit_date(c) for c in commits)
+
+    listed, written = sync_pages(folder, state, 'commits', 'sha', pages, projection, enrich, needs_files=True)
+    etag = None if gql else pages.etag
+    if not gql and pages.not_modified:
+        logging.info(f"💤 Sin cambios en commits: {url}")
 
-for entry in tqdm(forks, desc="Procesando forks"):
+    state['commits'].update({'since': newest(latest),
+                             'url': url, 'etag': etag})
+    logging.info(f"✅ {repo}: {listed} commits listados, {written} nuevos o enriquecidos")
+
+# Commits leídos del clon local: solo los que no se leyeron en la ejecución
+# anterior (tip), ya con sus archivos y sin ninguna petición a la API
+def collect_commits_from_git(git, entry, owner, repo, folder, state, projection, latest):
+    git_dir = git.sync(entry, owner, repo)
+    tip = state.get('commits', {}).get('tip')
+    pages = batched(git_backend.new_commits(git_dir, tip))
+
+    def enrich(commits):
+        # Los commits pendientes de una ejecución anterior por REST no tienen archivos
+        git_backend.add_files(git_dir, [c for c in commits if 'files' not in c])
+        latest.extend(commit_date(c) for c in commits)
+
+    listed, written = sync_pages(folder, state, 'commits', 'sha', pages, projection, enrich, needs_files=True)
+    state['commits'].update({'since': newest(latest), 'tip': git_backend.head(git_dir),
+                             'url': None, 'etag': None})
+    logging.info(f"✅ {repo}: {listed} commits leídos de git, {written} nuevos o enriquecidos")
+
+def collect_pulls(client, owner, repo, folder, state, projection, gql=None):
+    mark = stage_mark(folder, state, 'pulls', 'updated', 'number', updated_date)
+    latest = [mark]
+    # En GraphQL las PRs modificadas se guardan para añadirlas a issues.jsonl
+    updated_pulls = []
+
+    if gql:
+        # Las PRs llegan ya con sus archivos
+        url = None
+        pages = batched(github_graphql.fetch_pulls(gql, owner, repo, mark))
+    else:
+        # El listado de PRs no admite `since`: se ordena por actualización y se
+        # corta al llegar a PRs anteriores a la marca
+        url = f'repos/{owner}/{repo}/pulls?state=all&sort=updated&direction=desc&per_page=100'
+        stop = (lambda page: not page or page[-1].get('updated_at', '') < mark) if mark else None
+        pages = listing_pages(client, state, 'pulls', url, stop=stop)
+
+    # Índice de los commits ya guardados: se crea la primera vez que hace falta
+    index = []
+
+    def enrich(pulls):
+        pending = [pr for pr in pulls if 'files' not in pr]
+        if pending:
+            if not index:
+                index.append(CommitIndex.from_folder(folder))
+            pending = files_from_commits(index[0], pending)
+        enrich_pulls_with_files(client, owner, repo, pending)
+        latest.extend(updated_date(pr) for pr in pulls)
+        if gql:
+            updated_pulls.extend(github_graphql.pull_as_issue(pr) for pr in pulls)
+
+    listed, written = sync_pages(folder, state, 'pulls', 'number', pages, projection, enrich, needs_files=True)
+    etag = None if gql else pages.etag
+    if not gql and pages.not_modified:
+        logging.info(f"💤 Sin cambios en pulls: {url}")
+
+    state['pulls'].update({'updated': newest(latest),
+                           'url': url, 'etag': etag})
+    logging.info(f"✅ {repo}: {listed} PRs listadas, {written} nuevas o actualizadas")
+    return updated_pulls
+
+def collect_issues(client, owner, repo, folder, state, projection, gql=None, pulls=()):
+    mark = stage_mark(folder, state, 'issues', 'since', 'number', updated_date)
+    latest = [mark]
+
+    if gql:
+        # Como en REST, issues.jsonl incluye también las PRs
+        url = None
+        pages = batched(itertools.chain(github_graphql.fetch_issues(gql, owner, repo, mark), pulls))
+    else:
+        url = f'repos/{owner}/{repo}/issues?state=all&sort=updated&direction=desc&per_page=100'
+        if mark:
+            url += f'&since={mark}'
+        pages = listing_pages(client, state, 'issues', url)
+
+    def track(issues):
+        latest.extend(updated_date(issue) for issue in issues)
+
+    listed, written = sync_pages(folder, state, 'issues', 'number', pages, projection, track)
+    etag = None if gql else pages.etag
+    if not gql and pages.not_modified:
+        logging.info(f"💤 Sin cambios en issues: {url}")
+
+    state['issues'].update({'since': newest(latest),
+                            'url': url, 'etag': etag})
+    logging.info(f"✅ {repo}: {listed} issues listadas, {written} nuevas o actualizadas")
+
+# Descarga commits, PRs e issues de un fork y los guarda en su carpeta como
+# JSON Lines. En modo incremental solo pide lo nuevo desde la última ejecución
+# y retoma donde se quedó; con full=True lo descarga todo de nuevo.
+# Con gql (cliente GraphQL) los listados se piden por lotes en GraphQL y con
+# git (GitMirrors) los commits se leen de un clon local.
+# projection decide qué campos de cada objeto se guardan
+def collect_fork(client, entry, output_dir, full=False, gql=None, projection=None, git=None):
+    projection = projection or Projection()
     repo_csv = entry['repo']
     repo_full = repo_csv.replace('.csv', '')
     owner, repo = repo_full.split('/')
     folder_name = f"{owner}#{repo}"
-    folder = os.path.join('evaluation', folder_name)
+    folder = os.path.join(output_dir, folder_name)
 
     os.makedirs(folder, exist_ok=True)
+    if full:
+        for name in RECORD_TYPES:
+            for path in (jsonl_path(folder, name), legacy_path(folder, name), archive_path(folder, name)):
+                if os.path.exists(path):
+                    os.remove(path)
+        state = {}
+    else:
+        # Los volcados antiguos (.json) pasan a JSON Lines la primera vez
+        convert_folder(folder, remove=True)
+        state = load_checkpoint(folder)
 
-    # Commits
-    commits_url = f'https://api.github.com/repos/{owner}/{repo}/commits?per_page=100'
-    commits = fetch_all_pages(commits_url)
-    commits = enrich_commits_with_files(owner, repo, commits)
-    with open(os.path.join(folder, 'commits.json'), 'w') as f:
-        json.dump(commits, f, indent=2)
-
-    # Issues
-    issues_url = f'https://api.github.com/repos/{owner}/{repo}/issues?state=all&per_page=100'
-    issues = fetch_all_pages(issues_url)
-    with open(os.path.join(folder, 'issues.json'), 'w') as f:
-        json.dump(issues, f, indent=2)
-
-    # Pull Requests
-    pulls_url = f'https://api.github.com/repos/{owner}/{repo}/pulls?state=all&per_page=100'
-    pulls = fetch_all_pages(pulls_url)
-    pulls = enrich_pulls_with_files(owner, repo, pulls)
-    with open(os.path.join(folder, 'pulls.json'), 'w') as f:
-        json.dump(pulls, f, indent=2)
+    # La marca de cada etapa solo avanza cuando termina completa
+    collect_commits(client, owner, repo, folder, state, projection, gql, git, entry)
+    save_checkpoint(folder, state)
+    pulls = collect_pulls(client, owner, repo, folder, state, projection, gql)
+    save_checkpoint(folder, state)
+    collect_issues(client, owner, repo, folder, state, projection, gql, pulls)
+    save_checkpoint(folder, state)
 
     logging.info(f"✅ Datos guardados en {folder}")
+    return folder
+
+# Informa del presupuesto de la API y de cuántos forks por hora permite
+def log_budget(report, forks_done):
+    logging.info(
+        f"📊 {report['requests']} peticiones ({report['retries']} reintentos) en {report['elapsed_s']}s, "
+        f"{report['waited_s']}s esperando por el límite"
+    )
+    if report['limit_per_hour']:
+        logging.info(
+            f"📊 Límite: {report['limit_per_hour']} peticiones/hora, quedan {report['remaining']} "
+            f"(reinicio en {report['reset_in_s']}s)"
+        )
+        if forks_done and report['requests']:
+            per_fork = report['requests'] / forks_done
+            logging.info(
+                f"📊 Media de {per_fork:.0f} peticiones por fork → "
+                f"~{report['limit_per_hour'] / per_fork:.0f} forks/hora con este presupuesto"
+            )
+    # Con varios tokens, el reparto entre ellos
+    tokens = report.get('tokens', [])
+    if len(tokens) > 1:
+        for token in tokens:
+            logging.info(
+                f"🔑 Token {token['token']}: {token['requests']} peticiones, quedan {token['remaining']} "
+                f"de {token['limit_per_hour']} (reinicio en {token['reset_in_s']}s)"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="Recopila commits, issues y PRs de los forks")
+    parser.add_argument('--forks', default='forks2.json', help="Fichero JSON con la lista de forks")
+    parser.add_argument('--output', default='evaluation', help="Carpeta de salida")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help="Peticiones simultáneas como máximo (entre todos los forks)")
+    parser.add_argument('--fork-workers', type=int, default=4,
+                        help="Forks procesados a la vez")
+    parser.add_argument('--full', action='store_true',
+                        help="Ignora los checkpoints y vuelve a descargarlo todo")
+    parser.add_argument('--backend', choices=['rest', 'graphql', 'git'], default='rest',
+                        help="API usada para los listados (graphql trae las PRs con sus archivos por lotes; "
+                             "git lee los commits de un clon local)")
+    parser.add_argument('--mirrors', default=git_backend.MIRRORS_DIR,
+                        help="Carpeta de los clones bare con --backend git")
+    parser.add_argument('--projection', choices=PROJECTIONS, default='slim',
+                        help="slim guarda solo los campos que usan los pasos siguientes; full, el objeto completo")
+    parser.add_argument('--archive', action='store_true',
+                        help="Guarda además los objetos completos en raw/*.jsonl.gz")
+    args = parser.parse_args()
+
+    # Leer forks.json
+    with open(args.forks, 'r') as f:
+        forks = json.load(f)
+
+    client = GitHubClient(max_concurrency=args.concurrency)
+    # GraphQL tiene su propio presupuesto de peticiones, así que usa otro cliente
+    gql = GitHubClient(max_concurrency=args.concurrency) if args.backend == 'graphql' else None
+    git = GitMirrors(args.mirrors) if args.backend == 'git' else None
+    projection = Projection(args.projection, archive=args.archive)
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.fork_workers)) as pool:
+            futures = {
+                pool.submit(collect_fork, client, entry, args.output, args.full, gql, projection, git): entry
+                for entry in forks
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Procesando forks"):
+                try:
+                    future.result()
+                except (GitHubError, GitError, OSError, ValueError) as e:
+                    # Lo ya volcado se conserva; la marca de la etapa no avanza y se retoma en la siguiente ejecución
+                    logging.error(f"❌ Error procesando {futures[future]['repo']}: {e}")
+                    failed.append(futures[future]['repo'])
+    finally:
+        client.close()
+        if gql:
+            gql.close()
+
+    log_budget(client.limiter.budget_report(), len(forks) - len(failed))
+    if gql:
+        log_budget(gql.limiter.budget_report(), len(forks) - len(failed))
+
+    if failed:
+        logging.error(f"❌ {len(failed)} forks incompletos: {', '.join(sorted(failed))}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
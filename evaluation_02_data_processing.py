@@ -1,9 +1,17 @@
 import json
 import os
+import time
+import argparse
 import logging
 from collections import defaultdict
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from tqdm import tqdm
-import requests
+from github_client import GitHubClient
+from tagging import TagMatcher
+from feature_resolver import FeatureResolver
+from feature_inventory import features_from_data
+from record_store import RECORD_TYPES, has_records, iter_records, records_size, count_records
 
 # Configuración del log
 logging.basicConfig(
@@ -11,101 +19,59 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Token de GitHub
-GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-HEADERS = {
-    'Authorization': f'token {GITHUB_TOKEN}',
-    'Accept': 'application/vnd.github.v3+json'
-}
-
-# Palabras clave por tipo de tag
-KEYWORDS = {
-    'testing': ['test', 'testing', 'ci', 'unit', 'integration'],
-    'fix': ['fix', 'bug', 'error', 'fail'],
-    'mock': ['mock', 'stub'],
-    'config': ['config', 'configuration', 'setup'],
-    'model': ['model', 'schema'],
-    'extension': ['extend', 'extension', 'feature'],
-    'refactor': ['refactor', 'restructure'],
-    'obsolete': ['obsolete', 'deprecated', 'remove']
-}
+# Cliente de GitHub con caché en disco, solo para --features-source api
+# (GITHUB_OFFLINE=1 para no usar la red). Se crea la primera vez que hace
+# falta: con las features de los datos, ni los workers ni quien importa el
+# módulo abren la caché ni la sesión HTTP
+client = None
+
+def get_client():
+    global client
+    if client is None:
+        client = GitHubClient()
+    return client
+
+# Tags por palabras clave (tagging.KEYWORDS). TAG_WORD_BOUNDARY=1 exige
+# palabras completas ('ci' deja de coincidir con "decision")
+tag_matcher = TagMatcher(word_boundary=os.getenv('TAG_WORD_BOUNDARY') == '1')
 
 def extract_tags(text):
-    tags = set()
-    text = text.lower()
-    for tag, words in KEYWORDS.items():
-        if any(word in text for word in words):
-            tags.add(tag)
-    return tags
-
-def detect_features_from_path(file_path, valid_features):
-    parts = file_path.split('/')
-    for part in parts:
-        if part in valid_features:
-            return part
-    return None
+    return tag_matcher.extract(text)
 
 def get_valid_features_from_repo(owner, repo):
-    url = f'https://api.github.com/repos/{owner}/{repo}/contents/app/modules'
-    response = requests.get(url, headers=HEADERS)
+    response = get_client().get(f'repos/{owner}/{repo}/contents/app/modules')
     if response.status_code != 200:
         logging.warning(f"⚠️  No se pudo acceder a app/modules para {owner}/{repo}")
         return set()
     contents = response.json()
     return {item['name'] for item in contents if item['type'] == 'dir'}
 
-# Procesamiento de todos los forks
-with open('forks.json') as f:
-    forks = json.load(f)
-
-for entry in tqdm(forks, desc="Procesando forks"):
-    repo_csv = entry['repo']
-    repo_full = repo_csv.replace('.csv', '')
-    owner, repo = repo_full.split('/')
-    folder_name = f"{owner}#{repo}"
-    folder = os.path.join('evaluation', folder_name)
-
-    commits_file = os.path.join(folder, 'commits.json')
-    issues_file = os.path.join(folder, 'issues.json')
-    pulls_file = os.path.join(folder, 'pulls.json')
-
-    if not all(os.path.exists(f) for f in [commits_file, issues_file, pulls_file]):
-        logging.warning(f"⚠️  Archivos no encontrados para {repo_full}")
-        continue
-
-    with open(commits_file) as f:
-        commits = json.load(f)
-    with open(issues_file) as f:
-        issues = json.load(f)
-    with open(pulls_file) as f:
-        pulls = json.load(f)
-
-    valid_features = get_valid_features_from_repo(owner, repo)
-    logging.info(f"✅ Features detectadas en {repo}: {sorted(valid_features)}")
-
-    traceability_map = []
-
+# Tuplas [feature, fuente, tag, fecha, evento] de cada commit, issue y PR según
+# se leen. evento identifica el registro de origen (sha del commit o número de
+# la issue o PR), así dos eventos distintos con la misma feature, tag y fecha
+# no se confunden y cada tupla lleva de vuelta a su commit, issue o PR
+def event_tuples(commits, issues, pulls, resolver, valid_features):
     for commit in commits:
         sha = commit.get('sha')
         message = commit.get('commit', {}).get('message', '')
         tags = extract_tags(message)
         files = [f['filename'] for f in commit.get('files', [])] if 'files' in commit else []
         timestamp = commit.get('commit', {}).get('author', {}).get('date')
-        features = {detect_features_from_path(f, valid_features) for f in files}
-        for feature in features:
-            if feature:
-                for tag in tags:
-                    traceability_map.append([feature, 'commit', tag, timestamp])
+        features = resolver.features(files)
+        for feature in sorted(features):
+            for tag in sorted(tags):
+                yield [feature, 'commit', tag, timestamp, sha]
 
     for issue in issues:
+        number = issue.get('number')
         title = issue.get('title', '')
         tags = extract_tags(title)
         labels = issue.get('labels', [])
         features = {label['name'] for label in labels if label['name'] in valid_features}
         timestamp = issue.get('created_at')
-        for feature in features:
-            for tag in tags:
-                traceability_map.append([feature, 'issue', tag, timestamp])
+        for feature in sorted(features):
+            for tag in sorted(tags):
+                yield [feature, 'issue', tag, timestamp, number]
 
     for pr in pulls:
         number = pr.get('number')
@@ -113,16 +79,181 @@ for entry in tqdm(forks, desc="Procesando forks"):
         tags = extract_tags(title)
         files = [f['filename'] for f in pr.get('files', [])] if 'files' in pr else []
         timestamp = pr.get('created_at')
-        features = {detect_features_from_path(f, valid_features) for f in files}
-        for feature in features:
-            if feature:
-                for tag in tags:
-                    traceability_map.append([feature, 'pull_request', tag, timestamp])
+        features = resolver.features(files)
+        for feature in sorted(features):
+            for tag in sorted(tags):
+                yield [feature, 'pull_request', tag, timestamp, number]
+
+# Quita los duplicados según pasan (un mismo registro repetido en los datos),
+# conservando el orden. Solo se guarda el hash de (fuente, evento, feature,
+# tag) de cada tupla vista, no la tupla
+def unique_tuples(tuples):
+    seen = set()
+    for feature, source, tag, timestamp, event in tuples:
+        key = hash((source, event, feature, tag))
+        if key in seen:
+            continue
+        seen.add(key)
+        yield [feature, source, tag, timestamp, event]
+
+# Escribe las tuplas según llegan, con el mismo formato que json.dump(...,
+# indent=2), en un temporal que sustituye al fichero al terminar. Devuelve
+# cuántas se han escrito
+def write_traceability_map(path, tuples):
+    count = 0
+    temp_path = f'{path}.tmp'
+    try:
+        with open(temp_path, 'w') as f:
+            f.write('[')
+            for row in tuples:
+                f.write(',\n  ' if count else '\n  ')
+                f.write(json.dumps(row, indent=2).replace('\n', '\n  '))
+                count += 1
+            f.write('\n]' if count else ']')
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return count
+
+# Registros que procesa un worker entre dos avisos a la barra de progreso
+PROGRESS_CHUNK = 500
+# Segundos entre dos actualizaciones de la barra con --jobs
+PROGRESS_INTERVAL = 0.2
 
-    traceability_map = list(set(tuple(t) for t in traceability_map))
+# Deja pasar los registros y avisa a progress(n) cada PROGRESS_CHUNK y al final
+def counted(records, progress):
+    pending = 0
+    for record in records:
+        yield record
+        pending += 1
+        if pending == PROGRESS_CHUNK:
+            progress(pending)
+            pending = 0
+    if pending:
+        progress(pending)
 
+# Procesa un fork: lee sus registros, genera las tuplas y las escribe en
+# <folder>/traceability_map.json. Devuelve un resumen (tuplas, segundos y
+# bytes leídos); se ejecuta tanto en el proceso principal como en los workers.
+# progress(n) recibe los registros leídos por bloques, para la barra
+def process_fork(entry, evaluation_dir='evaluation', features_source='data', progress=None):
+    start = time.perf_counter()
+    repo_csv = entry['repo']
+    repo_full = repo_csv.replace('.csv', '')
+    owner, repo = repo_full.split('/')
+    folder_name = f"{owner}#{repo}"
+    folder = os.path.join(evaluation_dir, folder_name)
+    summary = {'repo': repo_full, 'tuples': None, 'seconds': 0.0, 'bytes_read': 0}
+
+    if not all(has_records(folder, name) for name in RECORD_TYPES):
+        logging.warning(f"⚠️  Archivos no encontrados para {repo_full}")
+        return summary
+
+    # Los registros se leen en streaming (commits.jsonl o el commits.json antiguo)
+    commits = iter_records(folder, 'commits')
+    issues = iter_records(folder, 'issues')
+    pulls = iter_records(folder, 'pulls')
+    if progress:
+        commits, issues, pulls = (counted(records, progress) for records in (commits, issues, pulls))
+    summary['bytes_read'] = sum(records_size(folder, name) for name in RECORD_TYPES)
+
+    # Por defecto las features salen de los propios datos (features.json), sin
+    # red; con 'api' se consulta app/modules en la rama principal como antes
+    if features_source == 'api':
+        valid_features = get_valid_features_from_repo(owner, repo)
+    else:
+        try:
+            valid_features = features_from_data(folder)
+        except (ValueError, OSError) as e:
+            logging.error(f"❌ No se pudieron leer los datos de {repo_full}: {e}")
+            return summary
+    if not valid_features:
+        logging.warning(f"⚠️  Ninguna feature detectada en {repo_full}")
+    logging.info(f"✅ Features detectadas en {repo}: {sorted(valid_features)}")
+    resolver = FeatureResolver(valid_features)
+
+    tuples = event_tuples(commits, issues, pulls, resolver, valid_features)
     output_path = os.path.join(folder, 'traceability_map.json')
-    with open(output_path, 'w') as f:
-        json.dump(traceability_map, f, indent=2)
+    try:
+        count = write_traceability_map(output_path, unique_tuples(tuples))
+    except (ValueError, OSError) as e:
+        # Un volcado ilegible no debe parar el resto de forks (ni el pool)
+        logging.error(f"❌ No se pudieron leer los datos de {repo_full}: {e}")
+        return summary
+
+    logging.info(f"✅ {count} tuplas escritas en {output_path}")
+    summary['tuples'] = count
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+# Procesa los forks en serie o, con jobs > 1, en un pool de procesos. Los
+# resúmenes se devuelven en el orden de la lista de forks. La barra avanza por
+# registros: cada worker avisa por una cola cada PROGRESS_CHUNK registros, así
+# un fork grande no parece parado hasta que termina
+def process_forks(forks, evaluation_dir='evaluation', jobs=1, features_source='data'):
+    summaries = [None] * len(forks)
+    with tqdm(total=total_records(forks, evaluation_dir), unit=' registros', desc="Procesando forks") as bar:
+        if jobs <= 1:
+            for index, entry in enumerate(forks):
+                summaries[index] = process_fork(entry, evaluation_dir, features_source, bar.update)
+                bar.set_postfix(forks=f'{index + 1}/{len(forks)}')
+            return summaries
+        with Manager() as manager, ProcessPoolExecutor(max_workers=jobs) as pool:
+            queue = manager.Queue()
+            futures = {pool.submit(process_fork, entry, evaluation_dir, features_source, queue.put): index
+                       for index, entry in enumerate(forks)}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                while not queue.empty():
+                    bar.update(queue.get())
+                for future in done:
+                    summaries[futures[future]] = future.result()
+                bar.set_postfix(forks=f'{len(forks) - len(pending)}/{len(forks)}')
+    return summaries
+
+# Registros de todos los forks, para el total de la barra (None si alguno
+# solo tiene los .json antiguos y no se pueden contar sin leerlos)
+def total_records(forks, evaluation_dir):
+    total = 0
+    for entry in forks:
+        owner, repo = entry['repo'].replace('.csv', '').split('/')
+        folder = os.path.join(evaluation_dir, f"{owner}#{repo}")
+        if not all(has_records(folder, name) for name in RECORD_TYPES):
+            continue
+        for name in RECORD_TYPES:
+            count = count_records(folder, name)
+            if count is None:
+                return None
+            total += count
+    return total
+
+def log_summary(summaries, elapsed):
+    done = [s for s in summaries if s['tuples'] is not None]
+    for s in done:
+        logging.info(f"📊 {s['repo']}: {s['tuples']} tuplas en {s['seconds']}s ({s['bytes_read'] / 1024:.0f} KB leídos)")
+    logging.info(
+        f"📊 {len(done)}/{len(summaries)} forks, {sum(s['tuples'] for s in done)} tuplas, "
+        f"{sum(s['bytes_read'] for s in done) / 1024 / 1024:.1f} MB leídos en {elapsed:.1f}s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera el mapa de trazabilidad de cada fork")
+    parser.add_argument('--forks', default='forks.json', help="Fichero JSON con la lista de forks")
+    parser.add_argument('--evaluation', default='evaluation', help="Carpeta con los datos de los forks")
+    parser.add_argument('--jobs', type=int, default=1, help="Forks procesados en paralelo (procesos)")
+    parser.add_argument('--features-source', choices=['data', 'api'], default='data',
+                        help="data: módulos vistos en commits y PRs (sin red); api: app/modules actual en GitHub")
+    args = parser.parse_args()
+
+    # Procesamiento de todos los forks
+    with open(args.forks) as f:
+        forks = json.load(f)
+
+    start = time.perf_counter()
+    summaries = process_forks(forks, args.evaluation, args.jobs, args.features_source)
+    log_summary(summaries, time.perf_counter() - start)
 
-    logging.info(f"✅ {len(traceability_map)} tuplas escritas en {output_path}")
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,231 @@
 import os
 import json
+import hashlib
+import argparse
 from tqdm import tqdm
+from crawl_state import load_json, write_json_atomic
+from feedback_store import FeedbackLog, store_path, table_path, index_path, write_table
+from feedback_cube import FeedbackCube, cube_path
 
-# Carpeta donde están los traceability maps por fork
-evaluation_dir = "evaluation"
-feedback_log = []
+# El feedback log se construye de forma incremental: un manifiesto guarda, para
+# cada fork, el tamaño, la fecha y el hash de su traceability_map.json, y en qué
+# filas y bytes del log está su segmento. En cada ejecución solo se vuelven a
+# leer los forks que han cambiado; los segmentos del resto se copian tal cual
+# del log anterior y los forks nuevos se añaden al final. --rebuild lo
+# reconstruye todo.
 
-# Recorrer todos los forks
-for fork_folder in tqdm(os.listdir(evaluation_dir), desc="Construyendo feedback log"):
-    fork_path = os.path.join(evaluation_dir, fork_folder)
-    traceability_file = os.path.join(fork_path, "traceability_map.json")
+def manifest_path(output):
+    return os.path.splitext(output)[0] + '.manifest.json'
 
-    if not os.path.exists(traceability_file):
-        continue
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
+# Forks con traceability map, en orden alfabético
+def scan_forks(evaluation_dir):
+    forks = {}
+    for fork_folder in sorted(os.listdir(evaluation_dir)):
+        traceability_file = os.path.join(evaluation_dir, fork_folder, "traceability_map.json")
+        if os.path.exists(traceability_file):
+            forks[fork_folder] = traceability_file
+    return forks
+
+def read_fork_rows(fork_folder, traceability_file):
     with open(traceability_file) as f:
         traceability_map = json.load(f)
 
+    rows = []
     for entry in traceability_map:
-        if len(entry) == 4:
-            feature, source_type, tag, timestamp = entry
-            feedback_log.append([feature, source_type, tag, fork_folder, timestamp])
+        # Los mapas nuevos llevan además el evento de origen (sha o número),
+        # que no pasa al feedback log
+        if len(entry) in (4, 5):
+            feature, source_type, tag, timestamp = entry[:4]
+            rows.append([feature, source_type, tag, fork_folder, timestamp])
         else:
             print(f"⚠️  Formato inesperado en {fork_folder}: {entry}")
+    return rows
+
+# Texto de cada fila tal y como lo escribe json.dump(..., indent=2) dentro de la lista
+def render_row(row):
+    return '  ' + json.dumps(row, indent=2).replace('\n', '\n  ')
+
+def render_segment(rows):
+    return ',\n'.join(render_row(row) for row in rows).encode()
+
+# Compara los forks del disco con el manifiesto. Devuelve el plan en orden (los
+# forks ya conocidos en su sitio y los nuevos al final) con el estado de cada uno
+def plan_forks(forks, manifest):
+    plan = []
+    known = set()
+    for entry in manifest['forks'] if manifest else []:
+        fork = entry['fork']
+        known.add(fork)
+        if fork not in forks:
+            plan.append((fork, 'removed', entry))
+            continue
+        stat = os.stat(forks[fork])
+        if [stat.st_size, stat.st_mtime_ns] == [entry['size'], entry['mtime_ns']]:
+            plan.append((fork, 'unchanged', entry))
+        elif file_digest(forks[fork]) == entry['sha256']:
+            # Solo ha cambiado la fecha: se conserva el segmento
+            plan.append((fork, 'touched', entry))
+        else:
+            plan.append((fork, 'changed', entry))
+    for fork in forks:
+        if fork not in known:
+            plan.append((fork, 'new', None))
+    return plan
+
+def fork_entry(fork, traceability_file, rows, byte_range, row_range):
+    stat = os.stat(traceability_file)
+    return {
+        'fork': fork,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': file_digest(traceability_file),
+        'rows': row_range,
+        'bytes': byte_range,
+        'count': len(rows),
+    }
+
+# Escribe el log completo: copia del log anterior los segmentos que no cambian
+# y genera el texto del resto. Devuelve los nuevos rangos de bytes por fork
+def write_log(output, segments):
+    tmp_path = f'{output}.tmp'
+    ranges = {}
+    src = open(output, 'rb') if os.path.exists(output) else None
+    try:
+        with open(tmp_path, 'wb') as dst:
+            dst.write(b'[\n')
+            for fork, old_range, text in segments:
+                if text is None and old_range:
+                    src.seek(old_range[0])
+                    text = src.read(old_range[1] - old_range[0])
+                if not text:
+                    ranges[fork] = None
+                    continue
+                if dst.tell() > 2:
+                    dst.write(b',\n')
+                start = dst.tell()
+                dst.write(text)
+                ranges[fork] = [start, dst.tell()]
+            # Un log vacío se escribe como '[]', igual que json.dump
+            if dst.tell() == 2:
+                dst.seek(0)
+                dst.truncate()
+                dst.write(b'[]')
+            else:
+                dst.write(b'\n]')
+    finally:
+        if src:
+            src.close()
+    os.replace(tmp_path, output)
+    return ranges
+
+# Añade segmentos al final de un log que no está vacío sin reescribir lo que ya hay
+def append_log(output, segments):
+    ranges = {}
+    with open(output, 'r+b') as f:
+        # Se sobrescribe el '\n]' final
+        f.seek(-2, os.SEEK_END)
+        for fork, _, text in segments:
+            if not text:
+                ranges[fork] = None
+                continue
+            f.write(b',\n')
+            start = f.tell()
+            f.write(text)
+            ranges[fork] = [start, f.tell()]
+        f.write(b'\n]')
+    return ranges
+
+def build_feedback_log(evaluation_dir, output, rebuild=False):
+    manifest_file = manifest_path(output)
+    manifest = None if rebuild else load_json(manifest_file)
+    old_log = None
+    if manifest:
+        # El manifiesto solo vale si el log y su versión columnar son los que describe
+        npz = store_path(output)
+        if not (os.path.exists(output) and os.path.getsize(output) == manifest.get('size')
+                and os.path.exists(npz)):
+            print("⚠️  El manifiesto no coincide con el feedback log; se reconstruye entero")
+            manifest = None
+        else:
+            old_log = FeedbackLog.load(npz)
+
+    forks = scan_forks(evaluation_dir)
+    plan = plan_forks(forks, manifest)
+    pending = [fork for fork, state, _ in plan if state in ('changed', 'new')]
+    removed = [fork for fork, state, _ in plan if state == 'removed']
+    if manifest and not pending and not removed:
+        if any(state == 'touched' for _, state, _ in plan):
+            for entry in manifest['forks']:
+                stat = os.stat(forks[entry['fork']])
+                entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            write_json_atomic(manifest_file, manifest)
+        print(f"✅ Feedback log sin cambios ({manifest['count']} entradas).")
+        return
+
+    # Solo se leen los forks que han cambiado
+    fresh = {}
+    for fork in tqdm(pending, desc="Construyendo feedback log"):
+        fresh[fork] = read_fork_rows(fork, forks[fork])
+
+    segments = []
+    parts = []
+    for fork, state, entry in plan:
+        if state == 'removed':
+            continue
+        if fork in fresh:
+            segments.append((fork, None, render_segment(fresh[fork])))
+            parts.append(FeedbackLog.from_rows(fresh[fork]))
+        else:
+            segments.append((fork, entry['bytes'], None))
+            parts.append(old_log.slice(*entry['rows']))
+
+    # Si solo hay forks nuevos, se añaden al final del log sin reescribirlo
+    only_new = manifest and manifest['count'] and not removed and \
+        all(state != 'changed' for _, state, _ in plan)
+    if only_new:
+        ranges = append_log(output, [segment for segment in segments if segment[2] is not None])
+        ranges.update({fork: old_range for fork, old_range, text in segments if text is None})
+    else:
+        ranges = write_log(output, segments)
+
+    log = FeedbackLog.concat(parts)
+    log.save(store_path(output))
+    write_table(log, table_path(output), index_path(output))
+    FeedbackCube.from_log(log).save(cube_path(output))
+
+    previous = {fork: entry for fork, _, entry in plan}
+    entries = []
+    row = 0
+    for (fork, _, _), part in zip(segments, parts):
+        row_range = [row, row + len(part)]
+        if fork in fresh:
+            entry = fork_entry(fork, forks[fork], fresh[fork], ranges[fork], row_range)
+        else:
+            stat = os.stat(forks[fork])
+            entry = dict(previous[fork], size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                         rows=row_range, bytes=ranges[fork])
+        entries.append(entry)
+        row += len(part)
+    write_json_atomic(manifest_file, {'count': len(log), 'size': os.path.getsize(output), 'forks': entries})
+
+    print(f"🔄 {len(pending)} forks procesados, {len(removed)} eliminados, "
+          f"{len(entries) - len(pending)} reutilizados del log anterior")
+    print(f"✅ Feedback log generado con {len(log)} entradas.")
 
-# Guardar en feedback_log.json
-with open("feedback_log.json", "w") as f:
-    json.dump(feedback_log, f, indent=2)
+def main():
+    parser = argparse.ArgumentParser(description="Construye el feedback log a partir de los traceability maps")
+    parser.add_argument('--evaluation', default="evaluation", help="Carpeta donde están los traceability maps por fork")
+    parser.add_argument('--output', default="feedback_log.json", help="Fichero del feedback log")
+    parser.add_argument('--rebuild', action='store_true', help="Ignora el manifiesto y lo reconstruye todo")
+    args = parser.parse_args()
+    build_feedback_log(args.evaluation, args.output, args.rebuild)
 
-print(f"✅ Feedback log generado con {len(feedback_log)} entradas.")
+if __name__ == '__main__':
+    main()
@@ -1,62 +1,63 @@
-import json
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+from report_data import ReportData, ANONYMOUS_LOG
 
-# Cargar el feedback log
-with open('feedback_log_anonymous.json') as f:
-    feedback_log = json.load(f)
-
-# Crear estructura: {feature: {tag: count}}
-data = {}
-for feature, source_type, tag, fork, timestamp in feedback_log:
-    if feature not in data:
-        data[feature] = {}
-    if tag not in data[feature]:
-        data[feature][tag] = 0
-    data[feature][tag] += 1
-
-# Convertir a DataFrame
-df = pd.DataFrame.from_dict(data, orient='index').fillna(0).astype(int)
-
-# Aplicar escala logarítmica
-df_log = df.copy()
-df_log[df_log > 0] = df_log[df_log > 0].applymap(lambda x: np.log10(x + 1))
-
-# Ordenar por actividad total
-df_log = df_log.loc[df.sum(axis=1).sort_values(ascending=False).index]
-
-# Crear carpeta si no existe
-os.makedirs("figures", exist_ok=True)
-
-# Graficar
-plt.figure(figsize=(18, 14))
-ax = sns.heatmap(
-    df_log,
-    cmap="Greys",
-    linewidths=0.5,
-    linecolor='lightgray',
-    cbar_kws={"label": "log10(occurrences + 1)"}
-)
-
-# Títulos y ejes grandes
-plt.title("Log-scaled Semantic Activity Heatmap (Features × Tags)", fontsize=20)
-plt.xlabel("Semantic Tags", fontsize=16)
-plt.ylabel("Features", fontsize=16)
-
-# Aumentar tamaño de ticks del eje X
-ax.tick_params(axis='x', labelsize=12, rotation=45)
-
-# Forzar tamaño de labels del eje Y
-ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
-
-plt.tight_layout()
-
-# Guardar
-plt.savefig("figures/feedback_heatmap_log.png")
-plt.savefig("figures/feedback_heatmap_log.svg")
-plt.close()
-
-print("✅ Mapa de calor actualizado guardado en figures/feedback_heatmap_log.{png,svg}")
+
+def render(data):
+    # Crear estructura: {feature: {tag: count}}
+    feature_tags = data.counters('feature', 'tag', ANONYMOUS_LOG)
+
+    # Convertir a DataFrame
+    df = pd.DataFrame.from_dict(feature_tags, orient='index').fillna(0).astype(int)
+
+    # Aplicar escala logarítmica
+    df_log = df.astype(float)
+    df_log[df_log > 0] = df_log[df_log > 0].map(lambda x: np.log10(x + 1))
+
+    # Ordenar por actividad total
+    df_log = df_log.loc[df.sum(axis=1).sort_values(ascending=False).index]
+
+    key = data.figures.key(__file__, df_log)
+    if data.figures.fresh("feedback_heatmap_log", key):
+        return
+
+    # Crear carpeta si no existe
+    os.makedirs("figures", exist_ok=True)
+
+    # Graficar
+    plt.figure(figsize=(18, 14))
+    ax = sns.heatmap(
+        df_log,
+        cmap="Greys",
+        linewidths=0.5,
+        linecolor='lightgray',
+        cbar_kws={"label": "log10(occurrences + 1)"}
+    )
+
+    # Títulos y ejes grandes
+    plt.title("Log-scaled Semantic Activity Heatmap (Features × Tags)", fontsize=20)
+    plt.xlabel("Semantic Tags", fontsize=16)
+    plt.ylabel("Features", fontsize=16)
+
+    # Aumentar tamaño de ticks del eje X
+    ax.tick_params(axis='x', labelsize=12, rotation=45)
+
+    # Forzar tamaño de labels del eje Y
+    ax.set_yticklabels(ax.get_yticklabels(), fontsize=12)
+
+    plt.tight_layout()
+
+    # Guardar
+    plt.savefig("figures/feedback_heatmap_log.png")
+    plt.savefig("figures/feedback_heatmap_log.svg")
+    plt.close()
+    data.figures.store("feedback_heatmap_log", key)
+
+    print("✅ Mapa de calor actualizado guardado en figures/feedback_heatmap_log.{png,svg}")
+
+
+if __name__ == '__main__':
+    render(ReportData())
@@ -0,0 +1,80 @@
+import os
+import logging
+from crawl_state import load_json, write_json_atomic
+from feature_resolver import MODULE_ROOTS
+from record_store import records_file, iter_records
+
+# Inventario de features de un fork sacado de los datos ya recogidos: cada
+# carpeta app/modules/<feature>/ que aparece en los archivos de algún commit o
+# PR. Incluye los módulos que existieron y luego se borraron, no depende de la
+# red y da siempre el mismo resultado para los mismos datos. Se guarda en
+# <folder>/features.json y se recalcula solo si cambian los registros.
+INVENTORY_FILE = 'features.json'
+
+SOURCES = ('commits', 'pulls')
+
+
+# Tamaño y fecha de modificación de los registros de los que sale el inventario
+def fingerprint(folder):
+    result = {}
+    for name in SOURCES:
+        path = records_file(folder, name)
+        if path:
+            stat = os.stat(path)
+            result[name] = [os.path.basename(path), stat.st_size, stat.st_mtime_ns]
+    return result
+
+
+def module_of(path, roots):
+    parts = path.split('/')
+    for root in roots:
+        depth = len(root)
+        # La feature es una carpeta: tiene que haber algo por debajo
+        if len(parts) > depth + 1 and parts[:depth] == root:
+            return parts[depth]
+    return None
+
+
+# Recorre los archivos de commits y PRs y devuelve {feature: [primera, última fecha]}
+def scan_features(folder, roots=MODULE_ROOTS):
+    roots = [[part for part in root.split('/') if part] for root in roots]
+    seen = {}
+
+    def add(files, date):
+        for f in files:
+            feature = module_of(f['filename'], roots)
+            if not feature:
+                continue
+            first, last = seen.get(feature, (date, date))
+            if date:
+                first = min(first or date, date)
+                last = max(last or date, date)
+            seen[feature] = (first, last)
+
+    for commit in iter_records(folder, 'commits'):
+        add(commit.get('files', []), commit.get('commit', {}).get('author', {}).get('date'))
+    for pr in iter_records(folder, 'pulls'):
+        add(pr.get('files', []), pr.get('created_at'))
+    return {feature: list(dates) for feature, dates in sorted(seen.items())}
+
+
+def load_inventory(folder, roots=MODULE_ROOTS, refresh=False):
+    path = os.path.join(folder, INVENTORY_FILE)
+    current = fingerprint(folder)
+    cached = None if refresh else load_json(path)
+    if cached and cached.get('fingerprint') == current and cached.get('roots') == list(roots):
+        return cached
+
+    inventory = {
+        'roots': list(roots),
+        'fingerprint': current,
+        'features': scan_features(folder, roots),
+    }
+    write_json_atomic(path, inventory)
+    logging.info(f"🔄 Inventario de features de {folder}: {len(inventory['features'])} módulos")
+    return inventory
+
+
+# Conjunto de features válidas de un fork a partir de su inventario
+def features_from_data(folder, roots=MODULE_ROOTS, refresh=False):
+    return set(load_inventory(folder, roots, refresh)['features'])
@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+# Carpetas donde vive cada feature: app/modules/<feature>/...
+MODULE_ROOTS = ('app/modules',)
+
+MEMO_SIZE = 1 << 16
+
+
+# Resuelve la feature a la que pertenece un archivo. Se construye una vez por
+# fork con sus features válidas: un árbol de prefijos con las raíces de los
+# módulos lleva directamente a app/modules/<feature>, y la respuesta de cada
+# ruta se memoriza porque las mismas rutas se repiten en miles de commits.
+#
+# Con legacy=True (por defecto), si la ruta no está bajo una raíz se busca la
+# primera carpeta que coincida con una feature en cualquier punto de la ruta,
+# igual que hacía detect_features_from_path. Con multi=True cada ruta puede
+# aportar varias features (todas las carpetas que coincidan).
+class FeatureResolver:
+    def __init__(self, valid_features, roots=MODULE_ROOTS, legacy=True, multi=False, memo_size=MEMO_SIZE):
+        self.valid_features = frozenset(valid_features)
+        self.legacy = legacy
+        self.multi = multi
+        self.trie = {}
+        for root in roots:
+            parts = [part for part in root.split('/') if part]
+            # Si una carpeta de la raíz es también una feature, la búsqueda
+            # original la encontraría antes; esa raíz se deja al modo legacy
+            if legacy and any(part in self.valid_features for part in parts):
+                continue
+            node = self.trie
+            for part in parts:
+                node = node.setdefault(part, {})
+            node[None] = True
+        self.resolve = lru_cache(maxsize=memo_size)(self._resolve)
+        self.resolve_all = lru_cache(maxsize=memo_size)(self._resolve_all)
+
+    # Feature bajo una raíz de módulos, o None
+    def _from_root(self, parts):
+        node = self.trie
+        for part in parts:
+            if None in node and part in self.valid_features:
+                return part
+            node = node.get(part)
+            if node is None:
+                return None
+        return None
+
+    def _resolve(self, path):
+        parts = path.split('/')
+        feature = self._from_root(parts)
+        if feature or not self.legacy:
+            return feature
+        for part in parts:
+            if part in self.valid_features:
+                return part
+        return None
+
+    def _resolve_all(self, path):
+        parts = path.split('/')
+        features = []
+        feature = self._from_root(parts)
+        if feature:
+            features.append(feature)
+        if self.legacy:
+            features += [part for part in parts if part in self.valid_features and part not in features]
+        return tuple(features)
+
+    # Features tocadas por una lista de archivos
+    def features(self, paths):
+        if self.multi:
+            return {feature for path in paths for feature in self.resolve_all(path)}
+        return {feature for feature in map(self.resolve, paths) if feature}
+
+    def cache_info(self):
+        return self.resolve_all.cache_info() if self.multi else self.resolve.cache_info()
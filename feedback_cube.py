@@ -0,0 +1,163 @@
+import os
+from collections import Counter, defaultdict
+import numpy as np
+from feedback_store import load_feedback_log, bucket_labels
+
+# Cubo de agregados del feedback log: número de entradas por (feature, tag,
+# source, fork, mes). Se calcula una vez al generar el log y se guarda junto a
+# él (feedback_log.cube.npz); los informes y gráficas sacan de aquí cualquier
+# agrupación con sumas de NumPy en lugar de recorrer el log entero.
+#
+#   cube = load_feedback_cube("feedback_log.json")
+#   cube.counters('tag', 'feature')      # {tag: Counter({feature: n})}
+#   cube.rollup('feature', 'month')      # pandas Series con las cuentas
+#   cube.frame('month', 'tag')           # tabla meses × tags (como pivot_table)
+#
+# Las celdas se guardan en el orden en que aparecen por primera vez en el log,
+# así las agrupaciones conservan ese orden igual que un Counter recorriendo el
+# log fila a fila.
+#
+# El cubo guardado es mensual; FeedbackCube.from_log(log, 'week') crea uno por
+# día, semana o sprint a partir de los epochs del log, sin volver a leer fechas.
+# La dimensión de tiempo se llama como el intervalo.
+
+DIMENSIONS = ('feature', 'tag', 'source', 'fork', 'month')
+
+
+def cube_path(json_path):
+    return os.path.splitext(json_path)[0] + '.cube.npz'
+
+
+class FeedbackCube:
+    def __init__(self, categories, coords, counts, bucket='month'):
+        # categories[dim]: valores; coords[dim]: código de cada celda; counts: entradas por celda
+        self.categories = categories
+        self.coords = coords
+        self.counts = counts
+        self.bucket = bucket
+        self.dimensions = DIMENSIONS[:4] + (bucket,)
+
+    @classmethod
+    def from_log(cls, log, bucket='month'):
+        dimensions = DIMENSIONS[:4] + (bucket,)
+        categories = {name: log.categories[name] for name in DIMENSIONS[:4]}
+        # Índices enteros ordenados, así que sus etiquetas también lo están
+        buckets, bucket_codes = np.unique(log.buckets(bucket), return_inverse=True)
+        categories[bucket] = bucket_labels(buckets, bucket)
+        keys = np.stack([log.codes['feature'], log.codes['tag'], log.codes['source'],
+                         log.codes['fork'], bucket_codes.astype(np.int32)], axis=1)
+        if not len(keys):
+            empty = np.empty(0, dtype=np.int32)
+            return cls(categories, {name: empty for name in dimensions}, np.empty(0, dtype=np.int64), bucket)
+        cells, first, inverse, counts = np.unique(keys, axis=0, return_index=True,
+                                                  return_inverse=True, return_counts=True)
+        order = np.argsort(first, kind='stable')
+        coords = {name: cells[order, i].astype(np.int32) for i, name in enumerate(dimensions)}
+        return cls(categories, coords, counts[order].astype(np.int64), bucket)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            bucket = str(data['bucket']) if 'bucket' in data.files else 'month'
+            dimensions = DIMENSIONS[:4] + (bucket,)
+            categories = {name: data[f'{name}_values'] for name in dimensions}
+            coords = {name: data[f'{name}_codes'] for name in dimensions}
+            return cls(categories, coords, data['count'], bucket)
+
+    def save(self, path):
+        tmp_path = f'{path}.tmp.npz'
+        arrays = {'count': self.counts, 'bucket': np.array(self.bucket)}
+        for name in self.dimensions:
+            arrays[f'{name}_values'] = self.categories[name]
+            arrays[f'{name}_codes'] = self.coords[name]
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def total(self):
+        return int(self.counts.sum())
+
+    # Subcubo con las celdas cuyos valores están en los indicados, p. ej. where(feature=['auth'])
+    def where(self, **filters):
+        mask = np.ones(len(self.counts), dtype=bool)
+        for name, values in filters.items():
+            if isinstance(values, str):
+                values = [values]
+            codes = np.flatnonzero(np.isin(self.categories[name], list(values)))
+            mask &= np.isin(self.coords[name], codes)
+        coords = {name: self.coords[name][mask] for name in self.dimensions}
+        return FeedbackCube(self.categories, coords, self.counts[mask], self.bucket)
+
+    # Suma las celdas por las dimensiones indicadas. Devuelve los valores de
+    # cada grupo (una lista por dimensión) y sus cuentas, en orden de aparición
+    def group(self, *dims):
+        if not len(self.counts):
+            return [[] for _ in dims], np.empty(0, dtype=np.int64)
+        keys = np.stack([self.coords[name] for name in dims], axis=1)
+        groups, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        sums = np.bincount(inverse.ravel(), weights=self.counts, minlength=len(groups)).astype(np.int64)
+        order = np.argsort(first, kind='stable')
+        labels = [self.categories[name][groups[order, i]].tolist() for i, name in enumerate(dims)]
+        return labels, sums[order]
+
+    # {valor de outer: Counter({valor de inner: cuentas})}, como un defaultdict(Counter)
+    def counters(self, outer, inner):
+        (outer_values, inner_values), sums = self.group(outer, inner)
+        result = defaultdict(Counter)
+        for key, value, count in zip(outer_values, inner_values, sums.tolist()):
+            result[key][value] = count
+        return result
+
+    def rollup(self, *dims):
+        import pandas as pd
+        labels, sums = self.group(*dims)
+        if len(dims) == 1:
+            index = pd.Index(labels[0], name=dims[0])
+        else:
+            index = pd.MultiIndex.from_arrays(labels, names=list(dims))
+        return pd.Series(sums, index=index, name='count')
+
+    # Eje de tiempo de una tabla: periodos para meses y días, fechas de inicio
+    # para semanas y sprints
+    def time_axis(self, labels):
+        import pandas as pd
+        if self.bucket in ('month', 'day'):
+            return pd.PeriodIndex(labels, freq=self.bucket[0].upper(), name=self.bucket)
+        return pd.DatetimeIndex(labels, name=self.bucket)
+
+    # Tabla index × columns con ceros donde no hay entradas, ordenada por ambos
+    # ejes como pivot_table. El tiempo se devuelve con time_axis()
+    def frame(self, index, columns):
+        table = self.rollup(index, columns).unstack(fill_value=0).sort_index().sort_index(axis=1)
+        if index == self.bucket:
+            table.index = self.time_axis(table.index)
+        if columns == self.bucket:
+            table.columns = self.time_axis(table.columns)
+        return table
+
+    # Matriz densa row_dim × col_dim (en el orden de categories) con las cuentas
+    def matrix(self, row_dim, col_dim):
+        result = np.zeros((len(self.categories[row_dim]), len(self.categories[col_dim])), dtype=np.int64)
+        np.add.at(result, (self.coords[row_dim], self.coords[col_dim]), self.counts)
+        return result
+
+    # Misma forma que matrix(): posición de la primera celda de cada par en el
+    # orden de aparición (len(counts) si el par no aparece)
+    def first_seen(self, row_dim, col_dim):
+        result = np.full((len(self.categories[row_dim]), len(self.categories[col_dim])),
+                         len(self.counts), dtype=np.int64)
+        np.minimum.at(result, (self.coords[row_dim], self.coords[col_dim]), np.arange(len(self.counts)))
+        return result
+
+
+# Carga el cubo de un feedback log; si falta o es más antiguo que el log, lo
+# calcula a partir de él y lo guarda
+def load_feedback_cube(path='feedback_log.json'):
+    cube_file = cube_path(path)
+    if os.path.exists(cube_file) and (not os.path.exists(path) or os.path.getmtime(cube_file) >= os.path.getmtime(path)):
+        return FeedbackCube.load(cube_file)
+    cube = FeedbackCube.from_log(load_feedback_log(path))
+    try:
+        cube.save(cube_file)
+    except OSError:
+        pass
+    return cube
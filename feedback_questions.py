@@ -0,0 +1,75 @@
+import json
+import numpy as np
+
+# Preguntas sobre el feedback log definidas como datos en questions.json: cada
+# una es una lista de tags ("tags") o un peso por tag ("weights"). El motor
+# construye una matriz features × tags con las cuentas del cubo y otra
+# tags × preguntas con los pesos, y responde todas las preguntas con un único
+# producto de matrices. Añadir una pregunta es añadir una entrada al JSON.
+#
+#   engine = QuestionEngine(cube, questions)
+#   for feature, score, active_tags in engine.ranking(0): ...
+
+QUESTIONS_FILE = 'questions.json'
+
+
+def load_questions(path=QUESTIONS_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+# {tag: peso} de una pregunta, en el orden en que aparecen los tags
+def question_weights(question):
+    if 'weights' in question:
+        return dict(question['weights'])
+    return dict.fromkeys(question['tags'], 1)
+
+
+class QuestionEngine:
+    def __init__(self, cube, questions):
+        self.questions = list(questions)
+        self.features = cube.categories['feature'].tolist()
+        self.tags = cube.categories['tag'].tolist()
+        tag_index = {tag: i for i, tag in enumerate(self.tags)}
+
+        self.counts = cube.matrix('feature', 'tag')
+        self.first_seen = cube.first_seen('feature', 'tag')
+
+        weights = [question_weights(question) for question in self.questions]
+        integral = all(float(w).is_integer() for ws in weights for w in ws.values())
+        shape = (len(self.tags), len(self.questions))
+        self.weights = np.zeros(shape, dtype=np.int64 if integral else np.float64)
+        # Posición de cada tag dentro de su pregunta (-1 si no está)
+        self.positions = np.full(shape, -1, dtype=np.int64)
+        for q, ws in enumerate(weights):
+            for position, (tag, weight) in enumerate(ws.items()):
+                if tag in tag_index:
+                    self.weights[tag_index[tag], q] = weight
+                    self.positions[tag_index[tag], q] = position
+
+        # Puntuación de cada feature en todas las preguntas: features × preguntas
+        self.scores = self.counts @ self.weights
+
+    # Máscara features × tags con los tags de la pregunta que tiene cada feature
+    def active(self, q):
+        return (self.counts > 0) & (self.positions[:, q] >= 0)
+
+    # Features de la pregunta q de mayor a menor puntuación con sus tags activos.
+    # Los empates quedan en el orden en que un Counter recorriendo los tags de
+    # la pregunta habría visto cada feature
+    def ranking(self, q, top=None):
+        active = self.active(q)
+        rows = np.flatnonzero(active.any(axis=1))
+        if not len(rows):
+            return []
+        positions = np.where(active[rows], self.positions[:, q], np.iinfo(np.int64).max)
+        first_tag = positions.argmin(axis=1)
+        order = np.lexsort((self.first_seen[rows, first_tag],
+                            positions[np.arange(len(rows)), first_tag],
+                            -self.scores[rows, q]))[:top]
+        tag_order = np.argsort(np.where(self.positions[:, q] >= 0, self.positions[:, q], len(self.tags)))
+        return [
+            (self.features[row], self.scores[row, q].item(),
+             [self.tags[t] for t in tag_order if active[row, t]])
+            for row in rows[order]
+        ]
@@ -0,0 +1,329 @@
+import os
+import json
+from datetime import datetime, timezone
+import numpy as np
+
+# Almacén columnar del feedback log. En lugar de una lista de filas
+# [feature, source, tag, fork, timestamp] con las cadenas repetidas en cada
+# fila, cada columna categórica se guarda como un array de códigos (int32) más
+# la lista de valores distintos, y el timestamp como segundos desde epoch
+# (int64) junto con el índice de su mes (int32). Todo va en un .npz junto al
+# JSON, que se mantiene como exportación. Las fechas se parsean una sola vez,
+# al construir el log; agrupar por día, semana, sprint o mes son operaciones
+# enteras sobre los epochs (bucket_index).
+#
+#   from feedback_store import load_feedback_log
+#   feedback_log = load_feedback_log("feedback_log.json")
+#   for feature, source_type, tag, fork, timestamp in feedback_log: ...
+#   df = feedback_log.to_frame()
+#
+# Además se puede guardar como tabla binaria ordenada por (fork, timestamp)
+# que se abre con memory-map: open_feedback_table() y table.select(fork, desde,
+# hasta) devuelven vistas sin copiar ni leer el resto del fichero.
+
+COLUMNS = ('feature', 'source', 'tag', 'fork', 'timestamp')
+CATEGORICAL = COLUMNS[:4]
+
+# Valor de un timestamp ausente (es el NaT de datetime64)
+NO_TIMESTAMP = np.iinfo(np.int64).min
+
+# Intervalos para las series temporales. Los días desde epoch empiezan en
+# jueves (1970-01-01): con WEEK_OFFSET las semanas y los sprints empiezan en lunes
+BUCKETS = ('day', 'week', 'sprint', 'month')
+SECONDS_PER_DAY = 86400
+WEEK_OFFSET = 3
+SPRINT_DAYS = 14
+NO_BUCKET = np.iinfo(np.int32).min
+
+BUCKET_LABELS = {'day': 'Day', 'week': 'Week', 'sprint': 'Sprint', 'month': 'Month'}
+BUCKET_FORMATS = {'day': 'YYYY-MM-DD', 'week': 'week of YYYY-MM-DD',
+                  'sprint': 'sprint of YYYY-MM-DD', 'month': 'YYYY-MM'}
+
+
+def store_path(json_path):
+    return os.path.splitext(json_path)[0] + '.npz'
+
+
+def table_path(json_path):
+    return os.path.splitext(json_path)[0] + '.table.npy'
+
+
+def index_path(json_path):
+    return os.path.splitext(json_path)[0] + '.index.json'
+
+
+# Una fila de la tabla binaria: códigos de las columnas categóricas y timestamp
+TABLE_DTYPE = np.dtype([('feature', np.int32), ('source', np.int32), ('tag', np.int32),
+                        ('fork', np.int32), ('timestamp', np.int64)])
+
+
+def to_epoch(value):
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    return parse_timestamp(value)
+
+
+# Las fechas sin zona horaria se leen en UTC, como las del camino rápido de
+# parse_timestamps; si no, dependerían de la zona de la máquina
+def parse_timestamp(value):
+    if not value:
+        return NO_TIMESTAMP
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def parse_timestamps(values):
+    values = list(values)
+    try:
+        # Camino rápido para el formato de GitHub (UTC con 'Z' final)
+        if all(v and v.endswith('Z') for v in values):
+            return np.array([v[:-1] for v in values], dtype='datetime64[s]').astype(np.int64)
+    except ValueError:
+        pass
+    return np.array([parse_timestamp(v) for v in values], dtype=np.int64)
+
+
+def format_timestamps(epochs):
+    strings = np.datetime_as_string(np.asarray(epochs).astype('datetime64[s]'), unit='s')
+    return [None if s == 'NaT' else f'{s}Z' for s in strings.tolist()]
+
+
+# Índice del intervalo de cada epoch: días, semanas o sprints desde epoch, o
+# meses desde 1970-01. Los timestamps ausentes quedan como NO_BUCKET
+def bucket_index(epochs, bucket='month', sprint_days=SPRINT_DAYS):
+    epochs = np.asarray(epochs, dtype=np.int64)
+    missing = epochs == NO_TIMESTAMP
+    days = np.floor_divide(np.where(missing, 0, epochs), SECONDS_PER_DAY)
+    if bucket == 'day':
+        index = days
+    elif bucket == 'week':
+        index = (days + WEEK_OFFSET) // 7
+    elif bucket == 'sprint':
+        index = (days + WEEK_OFFSET) // sprint_days
+    elif bucket == 'month':
+        index = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    else:
+        raise ValueError(f"Intervalo desconocido: {bucket} (opciones: {', '.join(BUCKETS)})")
+    return np.where(missing, NO_BUCKET, index).astype(np.int32)
+
+
+# Etiqueta de cada intervalo: 'YYYY-MM' para meses y la fecha de inicio
+# ('YYYY-MM-DD') para el resto; 'NaT' si no tiene fecha
+def bucket_labels(index, bucket='month', sprint_days=SPRINT_DAYS):
+    index = np.asarray(index, dtype=np.int64)
+    missing = index == NO_BUCKET
+    if bucket == 'month':
+        dates = index.astype('datetime64[M]')
+    else:
+        size = {'day': 1, 'week': 7, 'sprint': sprint_days}[bucket]
+        offset = 0 if bucket == 'day' else WEEK_OFFSET
+        dates = (index * size - offset).astype('datetime64[D]')
+    dates[missing] = np.datetime64('NaT')
+    return np.datetime_as_string(dates)
+
+
+class FeedbackLog:
+    def __init__(self, categories, codes, timestamps, months=None):
+        # categories[col]: valores distintos (array de str); codes[col]: índice de cada fila
+        self.categories = categories
+        self.codes = codes
+        self.timestamps = timestamps
+        # Mes de cada fila (meses desde 1970-01), calculado una vez con los timestamps
+        self.months = bucket_index(timestamps, 'month') if months is None else months
+
+    @classmethod
+    def from_rows(cls, rows):
+        rows = list(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        categories = {}
+        codes = {}
+        for name, values in zip(CATEGORICAL, columns):
+            uniques, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+            categories[name] = uniques
+            codes[name] = inverse.astype(np.int32)
+        return cls(categories, codes, parse_timestamps(columns[4]))
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as f:
+            return cls.from_rows(json.load(f))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            categories = {name: data[f'{name}_values'] for name in CATEGORICAL}
+            codes = {name: data[f'{name}_codes'] for name in CATEGORICAL}
+            months = data['month'] if 'month' in data.files else None
+            return cls(categories, codes, data['timestamp'], months)
+
+    def save(self, path):
+        tmp_path = f'{path}.tmp.npz'
+        arrays = {'timestamp': self.timestamps, 'month': self.months}
+        for name in CATEGORICAL:
+            arrays[f'{name}_values'] = self.categories[name]
+            arrays[f'{name}_codes'] = self.codes[name]
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # Filas [start, end) como vistas, sin copiar
+    def slice(self, start, end):
+        codes = {name: self.codes[name][start:end] for name in CATEGORICAL}
+        return FeedbackLog(self.categories, codes, self.timestamps[start:end], self.months[start:end])
+
+    # Une varios logs en uno, recalculando los códigos con los valores de todos
+    @classmethod
+    def concat(cls, logs):
+        logs = list(logs)
+        if not logs:
+            return cls.from_rows([])
+        categories = {}
+        codes = {}
+        for name in CATEGORICAL:
+            values = np.unique(np.concatenate([log.categories[name] for log in logs]).astype(str))
+            categories[name] = values
+            codes[name] = np.concatenate([
+                np.searchsorted(values, log.categories[name])[log.codes[name]].astype(np.int32)
+                if len(log.categories[name]) else np.empty(0, dtype=np.int32)
+                for log in logs
+            ])
+        timestamps = np.concatenate([log.timestamps for log in logs]).astype(np.int64)
+        months = np.concatenate([log.months for log in logs]).astype(np.int32)
+        return cls(categories, codes, timestamps, months)
+
+    # Intervalo de cada fila; el mes ya está calculado
+    def buckets(self, bucket='month', sprint_days=SPRINT_DAYS):
+        if bucket == 'month':
+            return self.months
+        return bucket_index(self.timestamps, bucket, sprint_days)
+
+    # Valores de una columna ya decodificados (array de str, o lista de ISO para timestamp)
+    def column(self, name):
+        if name == 'timestamp':
+            return format_timestamps(self.timestamps)
+        return self.categories[name][self.codes[name]]
+
+    # Filas como tuplas (feature, source, tag, fork, timestamp), igual que el JSON
+    def __iter__(self):
+        columns = [self.column(name) for name in CATEGORICAL]
+        return zip(*(c.tolist() for c in columns), self.column('timestamp'))
+
+    def rows(self):
+        return [list(row) for row in self]
+
+    # Código de un valor categórico (-1 si no aparece)
+    def code(self, name, value):
+        values = self.categories[name]
+        index = np.searchsorted(values, value)
+        return int(index) if index < len(values) and values[index] == value else -1
+
+    # DataFrame con las columnas de siempre y timestamp ya convertido a fecha (UTC)
+    def to_frame(self, categorical=False):
+        import pandas as pd
+        data = {}
+        for name in CATEGORICAL:
+            if categorical:
+                data[name] = pd.Categorical.from_codes(self.codes[name], categories=self.categories[name])
+            else:
+                data[name] = self.categories[name].astype(object)[self.codes[name]]
+        # NO_TIMESTAMP es el NaT de datetime64, así que se conserva como fecha ausente
+        data['timestamp'] = pd.DatetimeIndex(self.timestamps.astype('datetime64[s]')).tz_localize('UTC')
+        return pd.DataFrame(data, columns=list(COLUMNS))
+
+    # Exportación al formato JSON de siempre
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.rows(), f, indent=2)
+
+
+# Carga el feedback log de su .npz; si no existe o es más antiguo que el JSON,
+# lo construye a partir del JSON y lo guarda para la próxima vez
+def load_feedback_log(path='feedback_log.json'):
+    npz = store_path(path)
+    if os.path.exists(npz) and (not os.path.exists(path) or os.path.getmtime(npz) >= os.path.getmtime(path)):
+        return FeedbackLog.load(npz)
+    log = FeedbackLog.from_json(path)
+    try:
+        log.save(npz)
+    except OSError:
+        pass
+    return log
+
+
+# Escribe la tabla ordenada por (fork, timestamp) y el índice con el rango de
+# filas de cada fork y los valores de cada columna categórica
+def write_table(log, table_file, index_file):
+    order = np.lexsort((log.timestamps, log.codes['fork']))
+    table = np.empty(len(log), dtype=TABLE_DTYPE)
+    for name in CATEGORICAL:
+        table[name] = log.codes[name][order]
+    table['timestamp'] = log.timestamps[order]
+
+    tmp_path = f'{table_file}.tmp.npy'
+    np.save(tmp_path, table)
+    os.replace(tmp_path, table_file)
+
+    bounds = np.searchsorted(table['fork'], np.arange(len(log.categories['fork']) + 1))
+    index = {
+        'rows': len(table),
+        'sorted_by': ['fork', 'timestamp'],
+        'categories': {name: log.categories[name].tolist() for name in CATEGORICAL},
+        'forks': {fork: [int(bounds[code]), int(bounds[code + 1])]
+                  for code, fork in enumerate(log.categories['fork'].tolist())},
+    }
+    tmp_path = f'{index_file}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_file)
+
+
+# Tabla del feedback log abierta con memory-map. Las consultas devuelven vistas
+# de la tabla (arrays estructurados con TABLE_DTYPE) sin leer el resto
+class FeedbackTable:
+    def __init__(self, table_file, index_file):
+        with open(index_file) as f:
+            self.index = json.load(f)
+        self.table = np.load(table_file, mmap_mode='r')
+        self.categories = {name: np.array(values, dtype=str) for name, values in self.index['categories'].items()}
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def forks(self):
+        return list(self.index['forks'])
+
+    # Filas de un fork con timestamp en [start, end). Las fechas pueden ser ISO o epoch
+    def select(self, fork, start=None, end=None):
+        if fork not in self.index['forks']:
+            return self.table[:0]
+        first, last = self.index['forks'][fork]
+        rows = self.table[first:last]
+        timestamps = rows['timestamp']
+        lo = 0 if start is None else np.searchsorted(timestamps, to_epoch(start), side='left')
+        hi = len(rows) if end is None else np.searchsorted(timestamps, to_epoch(end), side='left')
+        return rows[lo:hi]
+
+    # Rango de fechas en varios forks (todos por defecto): una vista por fork
+    def select_many(self, forks=None, start=None, end=None):
+        return {fork: self.select(fork, start, end) for fork in (forks or self.forks)}
+
+    # Convierte una vista en FeedbackLog para iterar filas o crear un DataFrame
+    def to_log(self, rows):
+        codes = {name: rows[name] for name in CATEGORICAL}
+        return FeedbackLog(self.categories, codes, rows['timestamp'])
+
+
+# Abre la tabla del feedback log; si falta o es más antigua que el JSON, la
+# construye a partir del log columnar
+def open_feedback_table(path='feedback_log.json'):
+    table_file, index_file = table_path(path), index_path(path)
+    fresh = all(os.path.exists(p) for p in (table_file, index_file)) and (
+        not os.path.exists(path) or os.path.getmtime(table_file) >= os.path.getmtime(path))
+    if not fresh:
+        write_table(load_feedback_log(path), table_file, index_file)
+    return FeedbackTable(table_file, index_file)
@@ -0,0 +1,71 @@
+import os
+import json
+import hashlib
+import matplotlib
+import numpy as np
+from crawl_state import load_json, write_json_atomic
+
+# Caché de figuras por contenido. Cada figura guarda en figures/.hashes/ un hash
+# de los datos con los que se dibuja y de sus parámetros (el código del script
+# que la genera y la versión de matplotlib). Si al volver a generarla el hash
+# coincide y los ficheros siguen ahí, no se dibuja otra vez. --force en
+# report.py (o FIGURE_CACHE=0) las vuelve a dibujar todas.
+#
+#   key = data.figures.key(__file__, pivot)
+#   if data.figures.fresh("tag_evolution_global", key):
+#       return
+#   ... plt.savefig(...) ...
+#   data.figures.store("tag_evolution_global", key)
+
+FIGURES_DIR = 'figures'
+HASHES_DIR = '.hashes'
+FORMATS = ('png', 'svg')
+
+
+# Añade al hash una representación estable de un valor
+def update_digest(digest, value):
+    if hasattr(value, 'to_csv'):
+        # DataFrame o Series de pandas: valores, índice y columnas
+        digest.update(value.to_csv().encode())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(json.dumps(value, default=str).encode())
+    digest.update(b'\0')
+
+
+class FigureCache:
+    def __init__(self, folder=FIGURES_DIR, force=False):
+        self.folder = folder
+        self.force = force
+
+    def outputs(self, name):
+        return [os.path.join(self.folder, f'{name}.{fmt}') for fmt in FORMATS]
+
+    def hash_path(self, name):
+        return os.path.join(self.folder, HASHES_DIR, f'{name}.json')
+
+    # Hash de una figura: el script que la dibuja más todos sus datos de entrada
+    def key(self, source, *inputs):
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+        update_digest(digest, matplotlib.__version__)
+        for value in inputs:
+            update_digest(digest, value)
+        return digest.hexdigest()
+
+    # True si la figura ya está generada con los mismos datos
+    def fresh(self, name, key):
+        if self.force or not all(os.path.exists(path) for path in self.outputs(name)):
+            return False
+        stored = load_json(self.hash_path(name))
+        if stored and stored.get('key') == key:
+            print(f"⏭️  {name}: sin cambios, se conserva la figura")
+            return True
+        return False
+
+    def store(self, name, key):
+        os.makedirs(os.path.dirname(self.hash_path(name)), exist_ok=True)
+        write_json_atomic(self.hash_path(name), {'key': key, 'outputs': self.outputs(name)})
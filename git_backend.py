@@ -0,0 +1,175 @@
+import os
+import logging
+import subprocess
+
+# Backend de recogida de commits a partir de un clon local: en lugar de una
+# llamada a /commits/{sha} por commit para conocer sus archivos, se recorre el
+# historial de la rama principal con `git log --name-only` en una sola pasada,
+# sin gastar presupuesto de la API. Los commits se entregan con un generador
+# según se leen, en la misma forma que devuelve la API REST.
+#
+# Cada fork se guarda como clon bare en mirrors/<owner>#<repo>.git y en cada
+# ejecución solo se traen los commits nuevos (git fetch). Si la entrada de
+# forks.json tiene "path", se usa ese repositorio local tal cual.
+#
+# Las issues y las PRs no están en git, así que siguen pidiéndose a la API.
+
+MIRRORS_DIR = 'mirrors'
+GIT_BASE_URL = os.getenv('GITHUB_GIT_URL', 'https://github.com')
+
+# Separadores del formato de git log: \x1e entre commits y \x1f entre campos.
+# Con -z el mensaje termina en \0 y cada archivo también
+RECORD_SEP = b'\x1e'
+FIELD_SEP = '\x1f'
+LOG_FORMAT = '%x1e%H%x1f%P%x1f%an%x1f%ae%x1f%ad%x1f%cn%x1f%ce%x1f%cd%x1f%B'
+# Fechas en UTC con 'Z', como las de la API
+DATE_FORMAT = 'format-local:%Y-%m-%dT%H:%M:%SZ'
+
+CHUNK_SIZE = 1 << 16
+
+
+class GitError(Exception):
+    pass
+
+
+def run_git(args, cwd=None):
+    result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GitError(f"git {' '.join(args)}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+# Cuáles de los shas son commits del repositorio, en una sola llamada
+def existing_commits(git_dir, shas):
+    shas = list(shas)
+    if not shas:
+        return set()
+    result = subprocess.run(['git', '--git-dir', git_dir, 'cat-file', '--batch-check=%(objectname) %(objecttype)'],
+                            input=''.join(f'{sha}\n' for sha in shas), capture_output=True, text=True)
+    return {line.split()[0] for line in result.stdout.splitlines() if line.endswith(' commit')}
+
+
+# sha de la rama principal, o None si el repositorio no tiene commits
+def head(git_dir):
+    try:
+        return run_git(['--git-dir', git_dir, 'rev-parse', '--verify', '--quiet', 'HEAD^{commit}'])
+    except GitError:
+        return None
+
+
+# Clones bare de los forks, uno por repositorio
+class GitMirrors:
+    def __init__(self, mirrors_dir=MIRRORS_DIR, base_url=GIT_BASE_URL):
+        self.mirrors_dir = mirrors_dir
+        self.base_url = base_url.rstrip('/')
+
+    def path(self, entry, owner, repo):
+        if entry.get('path'):
+            return entry['path']
+        return os.path.join(self.mirrors_dir, f'{owner}#{repo}.git')
+
+    def url(self, entry, owner, repo):
+        return entry.get('url') or f'{self.base_url}/{owner}/{repo}.git'
+
+    # Crea el clon o trae lo nuevo. Devuelve el directorio git que hay que leer
+    def sync(self, entry, owner, repo):
+        path = self.path(entry, owner, repo)
+        if entry.get('path'):
+            # Repositorio local: se lee tal cual (con su .git si no es bare)
+            git_dir = os.path.join(path, '.git')
+            return git_dir if os.path.isdir(git_dir) else path
+        url = self.url(entry, owner, repo)
+        if os.path.isdir(path):
+            logging.info(f"🔄 git fetch {owner}/{repo}")
+            run_git(['--git-dir', path, 'fetch', '--quiet', '--prune', url,
+                     '+refs/heads/*:refs/heads/*', '+refs/tags/*:refs/tags/*'])
+        else:
+            os.makedirs(self.mirrors_dir, exist_ok=True)
+            logging.info(f"📥 git clone --bare {url}")
+            args = ['clone', '--quiet', '--bare']
+            # Sin blobs: para saber qué archivos cambian bastan commits y árboles
+            if '://' in url:
+                args.append('--filter=blob:none')
+            run_git([*args, url, path])
+        return path
+
+
+def parse_record(raw):
+    text = raw.decode('utf-8', errors='replace')
+    header, _, files = text.partition('\0')
+    sha, parents, author, author_email, author_date, committer, committer_email, committer_date, message = \
+        header.split(FIELD_SEP, 8)
+    return {
+        'sha': sha,
+        'commit': {
+            'author': {'name': author, 'email': author_email, 'date': author_date},
+            'committer': {'name': committer, 'email': committer_email, 'date': committer_date},
+            'message': message.rstrip('\n'),
+        },
+        'parents': [{'sha': parent} for parent in parents.split()],
+        'files': [{'filename': name} for name in files.lstrip('\n').split('\0') if name],
+    }
+
+
+# Commits de la rama principal (o de revs) del más nuevo al más antiguo, con
+# sus archivos. exclude son commits ya leídos: no se vuelve a pasar por ellos
+# ni por sus antecesores. Con no_walk solo se leen los commits de revs
+def iter_commits(git_dir, revs=('HEAD',), exclude=(), no_walk=False):
+    # Los merges se comparan con su primer padre, como hace la API
+    args = ['git', '--git-dir', git_dir, 'log', '-z', '--name-only', '--no-renames',
+            '--diff-merges=first-parent', f'--date={DATE_FORMAT}', f'--format={LOG_FORMAT}']
+    if no_walk:
+        args.append('--no-walk=unsorted')
+    args.append('--stdin')
+    env = dict(os.environ, TZ='UTC')
+    process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, env=env)
+    # Las revisiones van por stdin: no hay límite de longitud de la línea de órdenes
+    process.stdin.write(''.join(f'{rev}\n' for rev in revs).encode())
+    process.stdin.write(''.join(f'^{rev}\n' for rev in exclude).encode())
+    process.stdin.close()
+
+    buffer = b''
+    finished = False
+    try:
+        while True:
+            chunk = process.stdout.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+            *records, buffer = buffer.split(RECORD_SEP)
+            for raw in records:
+                if raw:
+                    yield parse_record(raw)
+        if buffer:
+            yield parse_record(buffer)
+        finished = True
+    finally:
+        if not finished:
+            # Se ha dejado de leer antes de terminar
+            process.kill()
+        process.stdout.close()
+        stderr = process.stderr.read().decode(errors='replace')
+        process.stderr.close()
+        code = process.wait()
+    if code != 0:
+        raise GitError(f"git log en {git_dir}: {stderr.strip()}")
+
+
+# Commits nuevos desde el último leído (tip). Si tip ya no existe (por ejemplo,
+# tras un force push) se recorre todo el historial
+def new_commits(git_dir, tip=None):
+    if not head(git_dir):
+        return iter(())
+    exclude = [tip] if tip and existing_commits(git_dir, [tip]) else []
+    return iter_commits(git_dir, exclude=exclude)
+
+
+# Añade los archivos a commits que no los tienen (de una ejecución anterior por REST)
+def add_files(git_dir, commits):
+    shas = existing_commits(git_dir, [c['sha'] for c in commits if 'files' not in c])
+    missing = {c['sha']: c for c in commits if c['sha'] in shas}
+    if missing:
+        for found in iter_commits(git_dir, revs=list(missing), no_walk=True):
+            missing[found['sha']]['files'] = found['files']
+    return commits
@@ -0,0 +1,457 @@
+import os
+import json
+import time
+import random
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from http_cache import ResponseCache, auth_scope
+
+# URL base de la API (se puede apuntar a replay_server.py para trabajar sin red)
+API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+# Número máximo de peticiones en vuelo, compartido por forks y llamadas de detalle
+MAX_CONCURRENCY = int(os.getenv('GITHUB_MAX_CONCURRENCY', '8'))
+
+# Con GITHUB_OFFLINE=1 solo se usa la caché en disco (sin red)
+OFFLINE = os.getenv('GITHUB_OFFLINE') == '1'
+
+# GITHUB_CACHE=0 desactiva la caché de respuestas
+USE_CACHE = os.getenv('GITHUB_CACHE', '1') != '0'
+
+# Tiempo máximo de espera por petición (segundos)
+TIMEOUT = 30
+
+# Reintentos ante errores transitorios (backoff exponencial con jitter)
+MAX_RETRIES = int(os.getenv('GITHUB_MAX_RETRIES', '5'))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+RETRY_STATUS = {500, 502, 503, 504}
+
+# Peticiones que se dejan sin gastar como margen, y fracción del límite
+# por debajo de la cual se empiezan a espaciar las peticiones
+RATE_LIMIT_RESERVE = 50
+PACING_FRACTION = 0.2
+
+# Archivos que GitHub devuelve como mucho para un commit o una PR; con más, la
+# lista llega truncada
+FILES_LIMIT = 3000
+# Archivos por página en /pulls/{n}/files (el máximo que admite)
+FILES_PER_PAGE = 100
+
+
+# Tokens de la API: GITHUB_TOKENS admite varios (separados por comas o
+# espacios) y cada uno suma su propio presupuesto; si no, GITHUB_TOKEN
+def env_tokens():
+    tokens = os.getenv('GITHUB_TOKENS', '').replace(',', ' ').split()
+    if tokens:
+        return list(dict.fromkeys(tokens))
+    return [os.getenv('GITHUB_TOKEN')]
+
+
+class GitHubError(Exception):
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+def is_rate_limited(response):
+    if response.status_code not in (403, 429):
+        return False
+    if 'Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0':
+        return True
+    return 'rate limit' in response.text.lower()
+
+
+# Planificador compartido que respeta el presupuesto de la API
+class RateLimiter:
+    def __init__(self, reserve=RATE_LIMIT_RESERVE, pacing_fraction=PACING_FRACTION):
+        self.reserve = reserve
+        self.pacing_fraction = pacing_fraction
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.waited = 0.0
+        self.started = time.time()
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    # Actualiza el estado con las cabeceras de cada respuesta
+    def update(self, response):
+        headers = response.headers
+        now = time.time()
+        with self._lock:
+            self.requests += 1
+            if 'X-RateLimit-Remaining' in headers:
+                self.limit = int(headers.get('X-RateLimit-Limit', self.limit or 0)) or self.limit
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+                self.reset = float(headers.get('X-RateLimit-Reset', now + 3600))
+            if is_rate_limited(response):
+                retry_after = headers.get('Retry-After')
+                if retry_after is not None:
+                    until = now + float(retry_after)
+                elif self.reset:
+                    until = self.reset + 1
+                else:
+                    until = now + 60
+                self.blocked_until = max(self.blocked_until, until)
+
+    def _delay(self, now):
+        delay = max(0.0, self.blocked_until - now)
+        if self.remaining is None or self.reset is None:
+            return delay
+
+        window = max(self.reset - now, 0.0)
+        usable = self.remaining - self.reserve
+        if usable <= 0:
+            # Presupuesto agotado: esperar al reinicio de la ventana
+            return max(delay, window + 1 if window else 0.0)
+        if self.limit and self.remaining < self.limit * self.pacing_fraction:
+            # Queda poco presupuesto: repartir lo que queda hasta el reinicio
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + window / usable
+            delay = max(delay, slot - now)
+        # Descontar la petición ya planificada hasta que llegue la siguiente cabecera
+        self.remaining -= 1
+        return delay
+
+    # Peticiones que quedan antes de la reserva (sin cabeceras todavía, el
+    # token se considera sin gastar)
+    def headroom(self):
+        if self.remaining is None:
+            return float('inf')
+        return self.remaining - self.reserve
+
+    # Momento a partir del cual el token vuelve a estar disponible
+    def available_at(self):
+        until = self.blocked_until
+        if self.reset is not None and self.headroom() <= 0:
+            until = max(until, self.reset + 1)
+        return until
+
+    # Reserva la siguiente petición y devuelve cuánto hay que esperar para lanzarla
+    def reserve_slot(self):
+        with self._lock:
+            delay = self._delay(time.time())
+            self.waited += delay
+        return delay
+
+    # Resumen del presupuesto y del ritmo que permite
+    def budget_report(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        report = {
+            'requests': self.requests,
+            'retries': self.retries,
+            'elapsed_s': round(elapsed, 1),
+            'waited_s': round(self.waited, 1),
+            'observed_per_hour': round(self.requests / elapsed * 3600),
+            'limit_per_hour': self.limit,
+            'remaining': self.remaining,
+            'reset_in_s': round(max(self.reset - time.time(), 0)) if self.reset else None,
+        }
+        return report
+
+
+# Varios tokens, cada uno con su RateLimiter. Cada petición va al token con
+# más presupuesto disponible; un token agotado (o bloqueado por un 403/429)
+# queda aparcado hasta su reinicio. Solo se espera si lo están todos, hasta
+# el primero que vuelva. Con un único token se comporta como su RateLimiter
+class TokenPool:
+    def __init__(self, tokens=None, reserve=RATE_LIMIT_RESERVE, pacing_fraction=PACING_FRACTION):
+        self.tokens = list(tokens) if tokens else env_tokens()
+        self.limiters = [RateLimiter(reserve, pacing_fraction) for _ in self.tokens]
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _choose(self, now):
+        ready = [i for i, limiter in enumerate(self.limiters) if limiter.available_at() <= now]
+        if ready:
+            return max(ready, key=lambda i: self.limiters[i].headroom())
+        return min(range(len(self.limiters)), key=lambda i: self.limiters[i].available_at())
+
+    # Bloquea hasta que algún token puede lanzar la petición y devuelve su índice
+    def wait(self):
+        with self._lock:
+            index = self._choose(time.time())
+            # La petición se descuenta del token elegido antes de soltar el cerrojo
+            delay = self.limiters[index].reserve_slot()
+        if delay > 0:
+            if delay > 5:
+                parked = sum(1 for l in self.limiters if l.available_at() > time.time())
+                logging.info(f"⏳ Esperando {delay:.0f}s por el límite de peticiones "
+                             f"({parked}/{len(self)} tokens aparcados)")
+            time.sleep(delay)
+        return index
+
+    def update(self, index, response):
+        self.limiters[index].update(response)
+
+    def token(self, index):
+        return self.tokens[index]
+
+    # Resumen conjunto (el límite por hora es la suma de todos los tokens) y,
+    # en 'tokens', el de cada token identificado por un prefijo de su hash
+    def budget_report(self):
+        reports = [limiter.budget_report() for limiter in self.limiters]
+        limits = [r['limit_per_hour'] for r in reports if r['limit_per_hour']]
+        remaining = [r['remaining'] for r in reports if r['remaining'] is not None]
+        resets = [r['reset_in_s'] for r in reports if r['reset_in_s'] is not None]
+        elapsed = max(r['elapsed_s'] for r in reports)
+        requests = sum(r['requests'] for r in reports)
+        return {
+            'requests': requests,
+            'retries': self.retries,
+            'elapsed_s': elapsed,
+            'waited_s': round(sum(r['waited_s'] for r in reports), 1),
+            'observed_per_hour': round(requests / max(elapsed, 1e-9) * 3600),
+            'limit_per_hour': sum(limits) if limits else None,
+            'remaining': sum(remaining) if remaining else None,
+            'reset_in_s': min(resets) if resets else None,
+            'tokens': [{'token': auth_scope(token)[:8], **report} for token, report in zip(self.tokens, reports)],
+        }
+
+
+# Recorre un listado página a página según llegan. Tras recorrerlo, etag
+# contiene el de la primera página y not_modified indica si respondió 304
+class PageIterator:
+    def __init__(self, client, path, params=None, etag=None, stop=None):
+        self.client = client
+        self.url = client.url(path)
+        self.params = params
+        self.etag = etag
+        self.stop = stop
+        self.not_modified = False
+
+    def __iter__(self):
+        url = self.url
+        params = self.params
+        headers = {'If-None-Match': self.etag} if self.etag else None
+        first = True
+        while url:
+            response = self.client.get(url, params=params, headers=headers)
+            if response.status_code == 304:
+                self.not_modified = True
+                return
+            if response.status_code != 200:
+                raise GitHubError(f"Error al obtener datos: {response.status_code} - {url}", response)
+            if first:
+                self.etag = response.headers.get('ETag')
+                first = False
+            page = response.json()
+            yield page
+            if self.stop and self.stop(page):
+                return
+            # Los parámetros ya vienen incluidos en el enlace a la siguiente página
+            params = None
+            headers = None
+            url = response.links.get('next', {}).get('url')
+
+
+# URL de la página `page` a partir de la de otra página del mismo listado
+def page_url(url, page):
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query['page'] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def page_number(url):
+    return int(dict(parse_qsl(urlsplit(url).query)).get('page', 1))
+
+
+def backoff_delay(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+# Con tokens (o GITHUB_TOKENS) las peticiones se reparten entre varios tokens
+# (TokenPool); limiter permite compartir el mismo pool entre clientes
+class GitHubClient:
+    def __init__(self, token=None, api_url=API_URL, max_concurrency=MAX_CONCURRENCY,
+                 max_retries=MAX_RETRIES, limiter=None, cache=None, offline=OFFLINE, tokens=None):
+        self.api_url = api_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        if limiter is None:
+            limiter = TokenPool(tokens or ([token] if token is not None else None))
+        self.limiter = limiter
+
+        # Caché de respuestas en disco, separada por API y por token (o por el
+        # conjunto de tokens del pool; con uno solo, la misma que antes)
+        if cache is None and (USE_CACHE or offline):
+            cache = ResponseCache()
+        self.cache = cache
+        self.offline = offline
+        pool_key = '\n'.join(sorted(t for t in limiter.tokens if t))
+        self.scope = f"{auth_scope(pool_key)}@{self.api_url}"
+
+        # Sesión con pool de conexiones reutilizables (keep-alive)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept': 'application/vnd.github.v3+json'})
+
+        # Limita las peticiones simultáneas aunque haya varios pools de hilos anidados
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def url(self, path):
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.api_url}/{path.lstrip('/')}"
+
+    # GET a través de la caché en disco. Una entrada vigente se devuelve sin
+    # tocar la red; una caducada se revalida con If-None-Match. Si quien llama
+    # manda su propio If-None-Match y coincide, se responde 304 como GitHub
+    def get(self, path, params=None, headers=None):
+        url = self.url(path)
+        if params:
+            url = requests.Request('GET', url, params=params).prepare().url
+        if self.cache is None:
+            return self._request('GET', url, headers)
+
+        wanted = (headers or {}).get('If-None-Match')
+        cached = self.cache.get(url, self.scope)
+        if cached and (self.offline or cached.is_fresh()):
+            return cached.as_response(not_modified=bool(wanted) and wanted == cached.etag)
+        if self.offline:
+            raise GitHubError(f"Sin respuesta en caché para {url} (modo offline)")
+
+        conditional = dict(headers or {})
+        if cached and cached.etag:
+            conditional['If-None-Match'] = cached.etag
+        response = self._request('GET', url, conditional)
+        if response.status_code == 304 and cached:
+            self.cache.refresh(cached, self.scope)
+            return cached.as_response(not_modified=bool(wanted) and wanted == cached.etag)
+        if response.status_code == 200:
+            self.cache.put(url, self.scope, response)
+        return response
+
+    # POST con cuerpo JSON (GraphQL). La caché lo indexa por URL + hash del cuerpo
+    # para poder reprocesar sin red; una entrada vigente se reutiliza tal cual
+    def post(self, path, payload):
+        url = self.url(path)
+        body = json.dumps(payload, sort_keys=True)
+        key = f"{url}#{hashlib.sha256(body.encode()).hexdigest()}"
+        if self.cache is not None:
+            cached = self.cache.get(key, self.scope)
+            if cached and (self.offline or cached.is_fresh()):
+                return cached.as_response()
+        if self.offline:
+            raise GitHubError(f"Sin respuesta en caché para {url} (modo offline)")
+
+        response = self._request('POST', url, {'Content-Type': 'application/json'}, body)
+        if response.status_code == 200 and self.cache is not None:
+            self.cache.put(key, self.scope, response)
+        return response
+
+    # Petición con control del límite de peticiones y reintentos. Devuelve la
+    # respuesta si no es transitoria; lanza GitHubError si se agotan los reintentos
+    def _request(self, method, url, headers=None, data=None):
+        for attempt in range(self.max_retries + 1):
+            # Cada intento puede ir con otro token si el anterior se ha agotado
+            index = self.limiter.wait()
+            token = self.limiter.token(index)
+            request_headers = {**(headers or {}), 'Authorization': f'token {token}'} if token else headers
+            response = None
+            rate_limited = False
+            try:
+                with self._slots:
+                    response = self.session.request(method, url, headers=request_headers, data=data, timeout=TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            else:
+                self.limiter.update(index, response)
+                rate_limited = is_rate_limited(response)
+                if response.status_code not in RETRY_STATUS and not rate_limited:
+                    return response
+                error = f"{response.status_code}"
+
+            if attempt == self.max_retries:
+                break
+            self.limiter.retries += 1
+            logging.warning(f"🔁 Reintento {attempt + 1}/{self.max_retries} ({error}) - {url}")
+            # Si es un límite de peticiones, el planificador ya sabe cuánto esperar
+            if not rate_limited:
+                time.sleep(backoff_delay(attempt))
+
+        raise GitHubError(f"Reintentos agotados ({error}) - {url}", response)
+
+    # Obtiene todos los resultados paginados siguiendo la cabecera Link.
+    # Cualquier error lanza GitHubError para no guardar listas truncadas
+    def fetch_all_pages(self, path, params=None):
+        results, _ = self.fetch_changes(path, params)
+        return results
+
+    # Igual que fetch_all_pages, pero la primera página es una petición
+    # condicional (If-None-Match): si no ha cambiado devuelve (None, etag) sin
+    # gastar presupuesto. stop(page) permite cortar la paginación antes del final
+    def fetch_changes(self, path, params=None, etag=None, stop=None):
+        pages = self.iter_pages(path, params, etag, stop)
+        results = [record for page in pages for record in page]
+        if pages.not_modified:
+            return None, etag
+        return results, pages.etag
+
+    def iter_pages(self, path, params=None, etag=None, stop=None):
+        return PageIterator(self, path, params, etag, stop)
+
+    def _get_page(self, url):
+        response = self.get(url)
+        if response.status_code != 200:
+            raise GitHubError(f"Error al obtener datos: {response.status_code} - {url}", response)
+        return response
+
+    # Todas las páginas de un recurso, en orden. La primera indica en su
+    # cabecera Link (rel="last") cuántas hay, y el resto se piden a la vez en
+    # lugar de una detrás de otra. Si no hay "last" se sigue "next"
+    def get_all_pages(self, path, params=None):
+        url = self.url(path)
+        if params:
+            url = requests.Request('GET', url, params=params).prepare().url
+        responses = [self._get_page(url)]
+        last = responses[0].links.get('last', {}).get('url')
+        if last:
+            urls = [page_url(last, page) for page in range(2, page_number(last) + 1)]
+            if urls:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(urls))) as pool:
+                    responses += pool.map(self._get_page, urls)
+            return responses
+        next_url = responses[0].links.get('next', {}).get('url')
+        while next_url:
+            responses.append(self._get_page(next_url))
+            next_url = responses[-1].links.get('next', {}).get('url')
+        return responses
+
+    # Archivos modificados de un commit (repos/.../commits/{sha}, los archivos
+    # van en 'files') o de una PR (repos/.../pulls/{n}/files, una lista).
+    # Devuelve (archivos, truncado): GitHub no da más de FILES_LIMIT
+    def fetch_files(self, path, params=None):
+        files = []
+        for response in self.get_all_pages(path, params):
+            body = response.json()
+            files += body.get('files', []) if isinstance(body, dict) else body
+        return files, len(files) >= FILES_LIMIT
+
+    # Aplica fn a cada elemento con un pool de hilos acotado, conservando el orden
+    def map(self, fn, items, desc=None, max_workers=None):
+        items = list(items)
+        if not items:
+            return []
+        workers = min(max_workers or self.max_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(tqdm(pool.map(fn, items), total=len(items), desc=desc, leave=False))
+
+    def close(self):
+        self.session.close()
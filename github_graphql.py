@@ -0,0 +1,264 @@
+import logging
+from github_client import GitHubError
+
+# Backend de recogida por GraphQL: trae commits, PRs con sus archivos e
+# issues con sus etiquetas en consultas paginadas por lotes, en lugar de una
+# llamada REST por PR. Los resultados se convierten a la misma forma que
+# devuelve la API REST para que los pasos 2-6 no cambien, y se entregan con
+# generadores según llegan las páginas.
+#
+# La API GraphQL no expone la lista de archivos de un commit, así que esos
+# siguen pidiéndose por REST (/commits/{sha}, que la caché guarda para siempre).
+
+COMMITS_QUERY = """
+query Commits($owner: String!, $name: String!, $after: String, $since: GitTimestamp) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: 100, after: $after, since: $since) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              url
+              message
+              author { name email date user { login } }
+              committer { name email date user { login } }
+              parents(first: 10) { nodes { oid } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+PULLS_QUERY = """
+query Pulls($owner: String!, $name: String!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 50, after: $after, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        url
+        state
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        author { login }
+        labels(first: 100) { nodes { name } }
+        headRefName
+        headRefOid
+        baseRefName
+        baseRefOid
+        mergeCommit { oid }
+        changedFiles
+        files(first: 100) {
+          pageInfo { hasNextPage endCursor }
+          nodes { path additions deletions changeType }
+        }
+      }
+    }
+  }
+}
+"""
+
+PULL_FILES_QUERY = """
+query PullFiles($owner: String!, $name: String!, $number: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      files(first: 100, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        nodes { path additions deletions changeType }
+      }
+    }
+  }
+}
+"""
+
+ISSUES_QUERY = """
+query Issues($owner: String!, $name: String!, $after: String, $since: DateTime) {
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, after: $after, filterBy: {since: $since}, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        url
+        state
+        createdAt
+        updatedAt
+        closedAt
+        author { login }
+        labels(first: 100) { nodes { name } }
+      }
+    }
+  }
+}
+"""
+
+FILE_STATUS = {
+    'ADDED': 'added',
+    'MODIFIED': 'modified',
+    'DELETED': 'removed',
+    'RENAMED': 'renamed',
+    'COPIED': 'copied',
+    'CHANGED': 'changed',
+}
+
+
+def run_query(client, query, variables):
+    operation = query.split('(', 1)[0].split()[-1]
+    response = client.post('graphql', {'query': query, 'variables': variables, 'operationName': operation})
+    if response.status_code != 200:
+        raise GitHubError(f"Error GraphQL {operation}: {response.status_code}", response)
+    data = response.json()
+    if data.get('errors'):
+        raise GitHubError(f"Error GraphQL {operation}: {data['errors'][0].get('message')}", response)
+    return data['data']
+
+
+# Recorre todas las páginas de una conexión. connection(data) devuelve el
+# objeto con pageInfo/nodes; stop(nodes) permite cortar antes del final
+def paginate(client, query, variables, connection, stop=None):
+    after = None
+    while True:
+        data = run_query(client, query, {**variables, 'after': after})
+        page = connection(data)
+        if page is None:
+            return
+        yield from page['nodes']
+        if stop and stop(page['nodes']):
+            return
+        if not page['pageInfo']['hasNextPage']:
+            return
+        after = page['pageInfo']['endCursor']
+
+
+def login(actor):
+    return {'login': actor['login']} if actor else None
+
+
+def labels(node):
+    return [{'name': label['name']} for label in node['labels']['nodes']]
+
+
+def to_rest_commit(node):
+    def signature(person):
+        return {'name': person['name'], 'email': person['email'], 'date': person['date']}
+
+    author_user = node['author'].get('user')
+    committer_user = node['committer'].get('user')
+    return {
+        'sha': node['oid'],
+        'commit': {
+            'author': signature(node['author']),
+            'committer': signature(node['committer']),
+            'message': node['message'],
+        },
+        'html_url': node['url'],
+        'author': login(author_user),
+        'committer': login(committer_user),
+        'parents': [{'sha': parent['oid']} for parent in node['parents']['nodes']],
+    }
+
+
+def to_rest_file(node):
+    return {
+        'filename': node['path'],
+        'status': FILE_STATUS.get(node['changeType'], node['changeType'].lower()),
+        'additions': node['additions'],
+        'deletions': node['deletions'],
+        'changes': node['additions'] + node['deletions'],
+    }
+
+
+def to_rest_pull(node, files):
+    pull = {
+        'number': node['number'],
+        'title': node['title'],
+        'body': node['body'],
+        'html_url': node['url'],
+        'state': 'open' if node['state'] == 'OPEN' else 'closed',
+        'user': login(node['author']),
+        'labels': labels(node),
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'closed_at': node['closedAt'],
+        'merged_at': node['mergedAt'],
+        'merge_commit_sha': node['mergeCommit']['oid'] if node['mergeCommit'] else None,
+        'head': {'ref': node['headRefName'], 'sha': node['headRefOid']},
+        'base': {'ref': node['baseRefName'], 'sha': node['baseRefOid']},
+        'changed_files': node['changedFiles'],
+        'files': files,
+    }
+    # GitHub no lista más de 3000 archivos de una PR (FILES_LIMIT)
+    if len(files) < node['changedFiles']:
+        pull['files_truncated'] = True
+    return pull
+
+
+def to_rest_issue(node):
+    return {
+        'number': node['number'],
+        'title': node['title'],
+        'body': node['body'],
+        'html_url': node['url'],
+        'state': node['state'].lower(),
+        'user': login(node['author']),
+        'labels': labels(node),
+        'created_at': node['createdAt'],
+        'updated_at': node['updatedAt'],
+        'closed_at': node['closedAt'],
+    }
+
+
+# La API REST de issues también devuelve las PRs, marcadas con 'pull_request'
+def pull_as_issue(pull):
+    issue = {k: pull[k] for k in ('number', 'title', 'body', 'state', 'user', 'labels',
+                                  'created_at', 'updated_at', 'closed_at')}
+    issue['html_url'] = pull['html_url']
+    issue['pull_request'] = {'html_url': pull['html_url'], 'merged_at': pull['merged_at']}
+    return issue
+
+
+def fetch_commits(client, owner, repo, since=None):
+    variables = {'owner': owner, 'name': repo, 'since': since}
+    history = lambda data: ((data['repository']['defaultBranchRef'] or {}).get('target') or {}).get('history')
+    return (to_rest_commit(node) for node in paginate(client, COMMITS_QUERY, variables, history))
+
+
+# PRs ordenadas por actualización; con `updated` se corta al llegar a las anteriores
+def fetch_pulls(client, owner, repo, updated=None):
+    variables = {'owner': owner, 'name': repo}
+    stop = (lambda nodes: not nodes or nodes[-1]['updatedAt'] < updated) if updated else None
+    for node in paginate(client, PULLS_QUERY, variables, lambda data: data['repository']['pullRequests'], stop):
+        if updated and node['updatedAt'] < updated:
+            continue
+        files = [to_rest_file(f) for f in node['files']['nodes']]
+        if node['files']['pageInfo']['hasNextPage']:
+            files += fetch_remaining_pull_files(client, owner, repo, node['number'],
+                                                node['files']['pageInfo']['endCursor'])
+        yield to_rest_pull(node, files)
+
+
+def fetch_remaining_pull_files(client, owner, repo, number, after):
+    files = []
+    while after:
+        data = run_query(client, PULL_FILES_QUERY, {'owner': owner, 'name': repo, 'number': number, 'after': after})
+        page = data['repository']['pullRequest']['files']
+        files += [to_rest_file(f) for f in page['nodes']]
+        after = page['pageInfo']['endCursor'] if page['pageInfo']['hasNextPage'] else None
+    logging.info(f"📄 PR #{number}: {len(files)} archivos adicionales")
+    return files
+
+
+def fetch_issues(client, owner, repo, since=None):
+    variables = {'owner': owner, 'name': repo, 'since': since}
+    return (to_rest_issue(node) for node in
+            paginate(client, ISSUES_QUERY, variables, lambda data: data['repository']['issues']))
@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Caché en disco de respuestas de la API compartida por todas las etapas.
+# Las entradas (entries/) se indexan por URL + ámbito de autenticación y
+# apuntan al cuerpo guardado por su hash (blobs/), así los cuerpos idénticos
+# se guardan una sola vez
+CACHE_DIR = os.getenv('GITHUB_CACHE_DIR', os.path.join('.cache', 'github'))
+
+# Tiempo de vida por defecto (segundos) y tamaño máximo de la caché
+CACHE_TTL = int(os.getenv('GITHUB_CACHE_TTL', '600'))
+CACHE_MAX_BYTES = int(os.getenv('GITHUB_CACHE_MAX_MB', '2048')) * 1024 * 1024
+
+# Recursos inmutables que no caducan (un commit concreto no cambia nunca)
+IMMUTABLE = [re.compile(r'/repos/[^/]+/[^/]+/commits/[0-9a-f]{40}(\?|$)')]
+
+# Cabeceras que se conservan con cada respuesta
+KEPT_HEADERS = ['ETag', 'Link', 'Content-Type', 'Last-Modified']
+
+
+def auth_scope(token):
+    if not token:
+        return 'anonymous'
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def ttl_for(url, default=CACHE_TTL):
+    if any(pattern.search(url) for pattern in IMMUTABLE):
+        return None
+    return default
+
+
+class CachedResponse:
+    def __init__(self, url, meta, body):
+        self.url = url
+        self.meta = meta
+        self.body = body
+
+    @property
+    def etag(self):
+        return self.meta['headers'].get('ETag')
+
+    def is_fresh(self, now=None):
+        ttl = self.meta.get('ttl')
+        if ttl is None:
+            return True
+        return (now or time.time()) - self.meta['stored_at'] < ttl
+
+    # Reconstruye un requests.Response para que el resto del código no note la diferencia
+    def as_response(self, not_modified=False):
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = 304 if not_modified else self.meta['status']
+        response.headers = CaseInsensitiveDict(self.meta['headers'])
+        response.headers['X-From-Cache'] = '1'
+        response._content = b'' if not_modified else self.body
+        response.encoding = 'utf-8'
+        return response
+
+
+class ResponseCache:
+    def __init__(self, root=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _entry_path(self, url, scope):
+        key = hashlib.sha256(f'{scope}\n{url}'.encode()).hexdigest()
+        return os.path.join(self.root, 'entries', key[:2], f'{key}.json')
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, 'blobs', digest[:2], digest)
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url, scope):
+        path = self._entry_path(url, scope)
+        try:
+            with open(path) as f:
+                meta = json.load(f)
+            with open(self._blob_path(meta['blob']), 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        # La fecha de modificación de la entrada marca el último acceso (LRU)
+        os.utime(path)
+        self.hits += 1
+        return CachedResponse(url, meta, body)
+
+    def put(self, url, scope, response):
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        added = 0
+        if not os.path.exists(blob_path):
+            self._write_atomic(blob_path, body)
+            added += len(body)
+
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'headers': {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+            'blob': digest,
+            'stored_at': time.time(),
+            'ttl': ttl_for(url, self.ttl),
+        }
+        data = json.dumps(meta).encode()
+        self._write_atomic(self._entry_path(url, scope), data)
+        added += len(data)
+        self._grow(added)
+
+    # Renueva una entrada tras un 304: el contenido sigue siendo válido
+    def refresh(self, cached, scope):
+        cached.meta['stored_at'] = time.time()
+        self._write_atomic(self._entry_path(cached.url, scope), json.dumps(cached.meta).encode())
+
+    def _files(self, kind):
+        base = os.path.join(self.root, kind)
+        for folder, _, names in os.walk(base):
+            for name in names:
+                if not name.endswith('.tmp'):
+                    yield os.path.join(folder, name)
+
+    def size(self):
+        total = 0
+        for kind in ('entries', 'blobs'):
+            for path in self._files(kind):
+                try:
+                    total += os.path.getsize(path)
+                except OSError:
+                    pass
+        return total
+
+    def _grow(self, added):
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += added
+            if self._size <= self.max_bytes:
+                return
+            self._size = self.evict()
+
+    # Elimina las entradas usadas hace más tiempo hasta quedar por debajo del
+    # 90% del tamaño máximo. Un cuerpo se borra cuando ya no lo usa ninguna entrada
+    def evict(self):
+        entries = []
+        refs = {}
+        for path in self._files('entries'):
+            try:
+                with open(path) as f:
+                    blob = json.load(f)['blob']
+                entries.append((os.path.getmtime(path), path, blob))
+            except (OSError, ValueError, KeyError):
+                continue
+            refs[blob] = refs.get(blob, 0) + 1
+        entries.sort()
+
+        total = self.size()
+        target = self.max_bytes * 0.9
+        for _, path, blob in entries:
+            if total <= target:
+                break
+            try:
+                total -= os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            refs[blob] -= 1
+            if refs[blob] == 0:
+                try:
+                    total -= os.path.getsize(self._blob_path(blob))
+                    os.remove(self._blob_path(blob))
+                except OSError:
+                    pass
+
+        # Cuerpos huérfanos (p. ej. de una escritura interrumpida); los recientes
+        # se respetan porque su entrada puede estar escribiéndose ahora mismo
+        now = time.time()
+        for path in self._files('blobs'):
+            if os.path.basename(path) not in refs:
+                try:
+                    if now - os.path.getmtime(path) < 60:
+                        continue
+                    total -= os.path.getsize(path)
+                    os.remove(path)
+                except OSError:
+                    pass
+        return total
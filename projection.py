@@ -0,0 +1,123 @@
+import os
+import gzip
+import json
+from record_store import RECORD_TYPES, jsonl_path, has_records, iter_records, append_records, write_records
+
+# Proyección de los objetos de GitHub a los campos que usan las etapas
+# siguientes. Los campos se indican como rutas con puntos; 'files[].filename'
+# recorre cada elemento de una lista. Una clave que no existe en el original
+# tampoco aparece en la proyección (así 'files' sigue marcando si un commit o
+# una PR ya se enriqueció), mientras que los valores null se conservan.
+SLIM_FIELDS = {
+    'commits': [
+        'sha',
+        'commit.message',
+        'commit.author.date',
+        'commit.committer.date',
+        'files[].filename',
+        'files_truncated',
+        'parents[].sha',
+    ],
+    'issues': [
+        'number',
+        'title',
+        'labels[].name',
+        'created_at',
+        'updated_at',
+        # Marca las PRs que devuelve el listado de issues
+        'pull_request.merged_at',
+    ],
+    'pulls': [
+        'number',
+        'title',
+        'labels[].name',
+        'created_at',
+        'updated_at',
+        'merged_at',
+        'merge_commit_sha',
+        'head.sha',
+        'base.sha',
+        'files[].filename',
+        'files_truncated',
+    ],
+}
+
+PROJECTIONS = ('slim', 'full')
+
+ARCHIVE_DIR = 'raw'
+
+
+# Convierte la lista de rutas en un árbol: {'commit': {'author': {'date': None}}, 'files[]': {...}}
+def compile_fields(fields):
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = field.split('.')
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node.setdefault(parts[-1], None)
+    return tree
+
+
+def project(record, tree):
+    if not isinstance(record, dict):
+        return record
+    result = {}
+    for name, subtree in tree.items():
+        many = name.endswith('[]')
+        key = name[:-2] if many else name
+        if key not in record:
+            continue
+        value = record[key]
+        if subtree is None or value is None:
+            result[key] = value
+        elif many:
+            result[key] = [project(item, subtree) for item in value]
+        else:
+            result[key] = project(value, subtree)
+    return result
+
+
+# Decide qué se guarda de cada registro: 'slim' solo los campos de SLIM_FIELDS,
+# 'full' el objeto completo. Con archive=True los objetos completos se guardan
+# además comprimidos en raw/<tipo>.jsonl.gz
+class Projection:
+    def __init__(self, name='slim', archive=False, fields=SLIM_FIELDS):
+        if name not in PROJECTIONS:
+            raise ValueError(f"Proyección desconocida: {name}")
+        self.name = name
+        self.archive = archive
+        self.trees = {kind: compile_fields(kind_fields) for kind, kind_fields in fields.items()}
+
+    def apply(self, kind, records):
+        if self.name == 'full':
+            return records
+        tree = self.trees[kind]
+        return (project(record, tree) for record in records)
+
+    def write(self, folder, kind, records):
+        if self.archive:
+            append_archive(folder, kind, records)
+        append_records(jsonl_path(folder, kind), self.apply(kind, records))
+
+
+def archive_path(folder, name):
+    return os.path.join(folder, ARCHIVE_DIR, f'{name}.jsonl.gz')
+
+
+# Archivo opcional con los objetos completos tal y como llegan de la API. Cada
+# escritura añade un miembro gzip nuevo; gzip los lee como un único fichero
+def append_archive(folder, name, records):
+    path = archive_path(folder, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'at') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
+
+
+# Reescribe los registros ya guardados de un fork con la proyección indicada
+def project_folder(folder, projection):
+    for kind in RECORD_TYPES:
+        if has_records(folder, kind):
+            write_records(jsonl_path(folder, kind), projection.apply(kind, iter_records(folder, kind)))
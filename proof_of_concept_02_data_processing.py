@@ -1,9 +1,11 @@
 import json
 import os
-import requests
 import logging
 from collections import defaultdict
 from tqdm import tqdm
+from github_client import GitHubClient, GitHubError, FILES_PER_PAGE
+from tagging import TagMatcher
+from feature_resolver import FeatureResolver
 
 # Configuración del log
 logging.basicConfig(
@@ -11,69 +13,36 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# Token de GitHub
-GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
-headers = {
-    'Authorization': f'token {GITHUB_TOKEN}',
-    'Accept': 'application/vnd.github.v3+json'
-}
+# Cliente de GitHub con caché en disco (GITHUB_OFFLINE=1 para no usar la red)
+client = GitHubClient()
 
 # --- FUNCIONES AUXILIARES ---
 
-# Palabras clave por tipo de tag
-KEYWORDS = {
-    'testing': ['test', 'testing', 'ci', 'unit', 'integration'],
-    'fix': ['fix', 'bug', 'error', 'fail'],
-    'mock': ['mock', 'stub'],
-    'config': ['config', 'configuration', 'setup'],
-    'model': ['model', 'schema'],
-    'extension': ['extend', 'extension', 'feature'],
-    'refactor': ['refactor', 'restructure'],
-    'obsolete': ['obsolete', 'deprecated', 'remove']
-}
+# Tags por palabras clave (tagging.KEYWORDS). TAG_WORD_BOUNDARY=1 exige
+# palabras completas ('ci' deja de coincidir con "decision")
+tag_matcher = TagMatcher(word_boundary=os.getenv('TAG_WORD_BOUNDARY') == '1')
 
 def extract_tags(text):
-    tags = set()
-    text = text.lower()
-    for tag, words in KEYWORDS.items():
-        if any(word in text for word in words):
-            tags.add(tag)
-    return tags
-
-def detect_features_from_path(file_path, valid_features):
-    parts = file_path.split('/')
-    for part in parts:
-        if part in valid_features:
-            return part
-    return None
+    return tag_matcher.extract(text)
 
 def get_commit_files(owner, repo, sha):
-    url = f'https://api.github.com/repos/{owner}/{repo}/commits/{sha}'
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return [f['filename'] for f in response.json().get('files', [])]
-    logging.warning(f"Error al obtener archivos del commit {sha}: {response.status_code}")
-    return []
+    try:
+        files, _ = client.fetch_files(f'repos/{owner}/{repo}/commits/{sha}')
+    except GitHubError as e:
+        logging.warning(f"Error al obtener archivos del commit {sha}: {e}")
+        return []
+    return [f['filename'] for f in files]
 
 def get_pull_files(owner, repo, number):
-    files = []
-    page = 1
-    while True:
-        url = f'https://api.github.com/repos/{owner}/{repo}/pulls/{number}/files?page={page}&per_page=100'
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            logging.warning(f"Error al obtener archivos del PR #{number}: {response.status_code}")
-            break
-        data = response.json()
-        if not data:
-            break
-        files += [f['filename'] for f in data]
-        page += 1
-    return files
+    try:
+        files, _ = client.fetch_files(f'repos/{owner}/{repo}/pulls/{number}/files', {'per_page': FILES_PER_PAGE})
+    except GitHubError as e:
+        logging.warning(f"Error al obtener archivos del PR #{number}: {e}")
+        return []
+    return [f['filename'] for f in files]
 
 def get_valid_features_from_repo(owner, repo):
-    url = f'https://api.github.com/repos/{owner}/{repo}/contents/app/modules'
-    response = requests.get(url, headers=headers)
+    response = client.get(f'repos/{owner}/{repo}/contents/app/modules')
 
     if response.status_code != 200:
         logging.warning(f"⚠️  No se pudo acceder a app/modules para {owner}/{repo}")
@@ -104,6 +73,7 @@ owner, repo = repo_full.split('/')
 
 # Obtener automáticamente las features válidas
 VALID_FEATURES = get_valid_features_from_repo(owner, repo)
+resolver = FeatureResolver(VALID_FEATURES)
 
 # --- PROCESAMIENTO ---
 
@@ -114,12 +84,12 @@ for commit in tqdm(commits, desc="Commits"):
     sha = commit.get('sha')
     message = commit.get('commit', {}).get('message', '')
     tags = extract_tags(message)
-    files = get_commit_files(owner, repo, sha)
-    features = set()
-    for file_path in files:
-        feature = detect_features_from_path(file_path, VALID_FEATURES)
-        if feature:
-            features.add(feature)
+    # Si el paso 1 ya guardó los archivos del commit no se vuelven a pedir
+    if 'files' in commit:
+        files = [f['filename'] for f in commit['files']]
+    else:
+        files = get_commit_files(owner, repo, sha)
+    features = resolver.features(files)
     for feature in features:
         for tag in tags:
             traceability_map.append((feature, 'commit', tag))
@@ -143,12 +113,11 @@ for pr in tqdm(pulls, desc="Pull Requests"):
     number = pr.get('number')
     title = pr.get('title', '')
     tags = extract_tags(title)
-    files = get_pull_files(owner, repo, number)
-    features = set()
-    for file_path in files:
-        feature = detect_features_from_path(file_path, VALID_FEATURES)
-        if feature:
-            features.add(feature)
+    if 'files' in pr:
+        files = [f['filename'] for f in pr['files']]
+    else:
+        files = get_pull_files(owner, repo, number)
+    features = resolver.features(files)
     for feature in features:
         for tag in tags:
             traceability_map.append((feature, 'pull_request', tag))
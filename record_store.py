@@ -0,0 +1,195 @@
+import os
+import json
+import logging
+
+# Almacenamiento en streaming de los volcados de cada fork: un registro JSON
+# por línea (commits.jsonl, issues.jsonl, pulls.jsonl). El paso 1 añade
+# registros según llegan las páginas y el paso 2 los lee con un generador, así
+# la memoria no depende del tamaño del fork. Los .json antiguos (un array
+# completo) se siguen pudiendo leer, también en streaming.
+RECORD_TYPES = ('commits', 'issues', 'pulls')
+
+READ_CHUNK = 1 << 16
+
+
+def jsonl_path(folder, name):
+    return os.path.join(folder, f'{name}.jsonl')
+
+
+def legacy_path(folder, name):
+    return os.path.join(folder, f'{name}.json')
+
+
+def has_records(folder, name):
+    return os.path.exists(jsonl_path(folder, name)) or os.path.exists(legacy_path(folder, name))
+
+
+# Fichero con los registros de un fork (.jsonl o el .json antiguo), o None
+def records_file(folder, name):
+    for path in (jsonl_path(folder, name), legacy_path(folder, name)):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# Tamaño en disco de los registros de un fork (en cualquiera de los dos formatos)
+def records_size(folder, name):
+    path = records_file(folder, name)
+    return os.path.getsize(path) if path else 0
+
+
+# Número de registros de un fork (líneas del .jsonl) sin decodificarlos, o
+# None si solo está el .json antiguo
+def count_records(folder, name):
+    path = jsonl_path(folder, name)
+    if not os.path.exists(path):
+        return 0 if not os.path.exists(legacy_path(folder, name)) else None
+    count = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while chunk := f.read(READ_CHUNK):
+            count += chunk.count(b'\n')
+            last = chunk[-1:]
+    # Última línea sin salto final
+    return count + (last != b'\n')
+
+
+# Una escritura interrumpida puede dejar la última línea a medias. Se lee todo
+# lo anterior y esa línea se descarta con un aviso (el paso 1 la vuelve a pedir)
+def iter_jsonl(path):
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith('\n'):
+                    raise
+                logging.warning(f"⚠️  {path}: última línea incompleta, se ignora")
+
+
+# Recorta el fichero hasta el último salto de línea, quitando el registro que
+# una escritura interrumpida dejó a medias. Devuelve los bytes eliminados
+def repair_tail(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - READ_CHUNK)
+            f.seek(start)
+            chunk = f.read(end - start)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            f.truncate(end)
+            logging.warning(f"⚠️  {path}: {size - end} bytes de un registro incompleto eliminados")
+        return size - end
+
+
+# Lee un array JSON elemento a elemento sin cargar el fichero entero
+def iter_json_array(path):
+    decoder = json.JSONDecoder()
+    with open(path) as f:
+        buf = f.read(READ_CHUNK).lstrip()
+        if not buf:
+            return
+        if buf[0] != '[':
+            raise ValueError(f"{path} no contiene un array JSON")
+        pos = 1
+        eof = False
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                if pos >= len(buf):
+                    raise json.JSONDecodeError('fin del búfer', buf, pos)
+                obj, end = decoder.raw_decode(buf, pos)
+                # Un número al final del búfer podría estar cortado
+                if end == len(buf) and not eof:
+                    raise json.JSONDecodeError('fin del búfer', buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Se descarta lo ya leído y se duplica la lectura para objetos grandes
+                buf = buf[pos:]
+                pos = 0
+                more = f.read(max(READ_CHUNK, len(buf)))
+                eof = not more
+                buf += more
+                continue
+            yield obj
+            pos = end
+
+
+# Recorre los registros de un fork: primero .jsonl y, si no existe, el .json antiguo
+def iter_records(folder, name):
+    path = jsonl_path(folder, name)
+    if os.path.exists(path):
+        return iter_jsonl(path)
+    path = legacy_path(folder, name)
+    if os.path.exists(path):
+        return iter_json_array(path)
+    return iter(())
+
+
+def append_records(path, records):
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
+
+
+def write_records(path, records):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
+    os.replace(tmp_path, path)
+
+
+# Deja solo la última versión de cada registro (por su clave) sin cargar el
+# fichero en memoria: una pasada para localizar las últimas apariciones y otra
+# para copiarlas. Antes quita la última línea si quedó a medias. Devuelve el
+# número de registros resultante
+def compact(path, key):
+    if not os.path.exists(path):
+        return 0
+    repair_tail(path)
+    last = {}
+    with open(path) as f:
+        for index, line in enumerate(f):
+            if line.strip():
+                last[json.loads(line)[key]] = index
+    keep = set(last.values())
+    tmp_path = f'{path}.tmp'
+    with open(path) as src, open(tmp_path, 'w') as dst:
+        for index, line in enumerate(src):
+            if index in keep:
+                dst.write(line)
+    os.replace(tmp_path, path)
+    return len(keep)
+
+
+# Convierte los .json de un fork a .jsonl. Con remove=True borra los originales
+def convert_folder(folder, remove=False):
+    converted = []
+    for name in RECORD_TYPES:
+        source = legacy_path(folder, name)
+        if not os.path.exists(source) or os.path.exists(jsonl_path(folder, name)):
+            continue
+        write_records(jsonl_path(folder, name), iter_json_array(source))
+        if remove:
+            os.remove(source)
+        converted.append(name)
+    if converted:
+        logging.info(f"🔄 {folder}: {', '.join(converted)} convertidos a JSON Lines")
+    return converted
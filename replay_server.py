@@ -0,0 +1,417 @@
+import os
+import json
+import time
+import hashlib
+import random
+import argparse
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, urlencode
+from record_store import iter_records
+
+# Servidor HTTP local que imita la API de GitHub (REST y las consultas
+# GraphQL de github_graphql.py) reproduciendo las respuestas ya guardadas en
+# evaluation/<owner>#<repo>/. Sirve para probar evaluation_01_data_source.py sin red:
+#
+#   python replay_server.py --port 8765 --latency 50
+#   GITHUB_API_URL=http://127.0.0.1:8765 python evaluation_01_data_source.py --forks forks.json --output /tmp/replay
+
+# Configuración del log
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Archivos por página de un commit, y archivos que se devuelven como mucho de
+# un commit o una PR
+COMMIT_FILES_PER_PAGE = 300
+FILES_LIMIT = 3000
+
+
+class ReplayData:
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._forks = {}
+        self._lock = threading.Lock()
+
+    def _load(self, folder, name):
+        return list(iter_records(folder, name))
+
+    # Carga perezosa de los datos de un fork (una sola vez)
+    def fork(self, owner, repo):
+        key = f'{owner}#{repo}'
+        with self._lock:
+            if key not in self._forks:
+                folder = os.path.join(self.data_dir, key)
+                if not os.path.isdir(folder):
+                    self._forks[key] = None
+                else:
+                    commits = self._load(folder, 'commits')
+                    pulls = self._load(folder, 'pulls')
+                    self._forks[key] = {
+                        'commits': commits,
+                        'commits_by_sha': {c['sha']: c for c in commits},
+                        'issues': self._load(folder, 'issues'),
+                        'pulls': pulls,
+                        'pulls_by_number': {p['number']: p for p in pulls},
+                    }
+            return self._forks[key]
+
+
+# Presupuesto simulado de peticiones con cabeceras X-RateLimit-*
+class ReplayBudget:
+    def __init__(self, limit, window=3600):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset = time.time() + window
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            now = time.time()
+            if now >= self.reset:
+                self.remaining = self.limit
+                self.reset = now + self.window
+            allowed = self.remaining > 0
+            if allowed:
+                self.remaining -= 1
+            return allowed, self.headers()
+
+    # Las respuestas 304 no cuentan contra el límite
+    def refund(self):
+        with self._lock:
+            self.remaining = min(self.limit, self.remaining + 1)
+            return self.headers()
+
+    def headers(self):
+        return {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(int(self.reset)),
+        }
+
+
+# Un presupuesto por token (cabecera Authorization), como en GitHub
+class ReplayBudgets:
+    def __init__(self, limit, window=3600):
+        self.limit = limit
+        self.window = window
+        self.budgets = {}
+        self._lock = threading.Lock()
+
+    def for_token(self, authorization):
+        with self._lock:
+            if authorization not in self.budgets:
+                self.budgets[authorization] = ReplayBudget(self.limit, self.window)
+            return self.budgets[authorization]
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    data = None
+    latency = 0.0
+    budgets = None
+    budget = None
+    fail_rate = 0.0
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        if status == 200:
+            etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+            headers = {**(headers or {}), 'ETag': etag}
+            if self.headers.get('If-None-Match') == etag:
+                if self.budget:
+                    self.extra_headers = self.budget.refund()
+                status, payload = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in {**self.extra_headers, **(headers or {})}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def not_found(self):
+        self.send_json(404, {'message': 'Not Found'})
+
+    # Devuelve una página de una lista con su cabecera Link, como hace GitHub
+    def send_page(self, items, query):
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        page = int(query.get('page', ['1'])[0])
+        start = (page - 1) * per_page
+        chunk = items[start:start + per_page]
+
+        last = max(1, -(-len(items) // per_page))
+        links = []
+        if page < last:
+            links.append(f'<{self.page_url(query, page + 1)}>; rel="next"')
+            links.append(f'<{self.page_url(query, last)}>; rel="last"')
+        headers = {'Link': ', '.join(links)} if links else None
+        self.send_json(200, chunk, headers)
+
+    # Un commit con sus archivos paginados (300 por página por defecto), como hace GitHub
+    def send_commit(self, commit, query):
+        files = commit.get('files', [])[:FILES_LIMIT]
+        per_page = min(int(query.get('per_page', [str(COMMIT_FILES_PER_PAGE)])[0]), COMMIT_FILES_PER_PAGE)
+        page = int(query.get('page', ['1'])[0])
+        last = max(1, -(-len(files) // per_page))
+        links = []
+        if page < last:
+            links.append(f'<{self.page_url(query, page + 1)}>; rel="next"')
+            links.append(f'<{self.page_url(query, last)}>; rel="last"')
+        body = {**commit, 'files': files[(page - 1) * per_page:page * per_page]}
+        self.send_json(200, body, {'Link': ', '.join(links)} if links else None)
+
+    def sort(self, items, query):
+        if query.get('sort', [None])[0] != 'updated':
+            return items
+        descending = query.get('direction', ['desc'])[0] == 'desc'
+        return sorted(items, key=lambda item: item['updated_at'], reverse=descending)
+
+    def page_url(self, query, page):
+        params = {k: v[0] for k, v in query.items()}
+        params['page'] = page
+        host = self.headers.get('Host', f'127.0.0.1:{self.server.server_port}')
+        return f"http://{host}{urlsplit(self.path).path}?{urlencode(params)}"
+
+    # Latencia, presupuesto y fallos simulados; devuelve False si ya se respondió
+    def admit(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+        self.extra_headers = {}
+        if self.budgets:
+            self.budget = self.budgets.for_token(self.headers.get('Authorization'))
+            allowed, self.extra_headers = self.budget.take()
+            if not allowed:
+                self.send_json(403, {'message': 'API rate limit exceeded'})
+                return False
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.send_json(502, {'message': 'Server Error'})
+            return False
+        return True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if not self.admit():
+            return
+        if urlsplit(self.path).path.rstrip('/') != '/graphql':
+            return self.not_found()
+        variables = payload.get('variables') or {}
+        fork = self.data.fork(variables.get('owner'), variables.get('name'))
+        if fork is None:
+            return self.send_json(200, {'data': {'repository': None},
+                                        'errors': [{'type': 'NOT_FOUND', 'message': 'Could not resolve to a Repository'}]})
+        resolver = GRAPHQL_RESOLVERS.get(payload.get('operationName'))
+        if resolver is None:
+            return self.send_json(200, {'errors': [{'message': f"Operación no soportada: {payload.get('operationName')}"}]})
+        self.send_json(200, {'data': {'repository': resolver(fork, variables)}})
+
+    def do_GET(self):
+        if not self.admit():
+            return
+
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        segments = [s for s in parts.path.split('/') if s]
+        if len(segments) < 4 or segments[0] != 'repos':
+            return self.not_found()
+
+        owner, repo, resource, rest = segments[1], segments[2], segments[3], segments[4:]
+        fork = self.data.fork(owner, repo)
+        if fork is None:
+            return self.not_found()
+
+        since = query.get('since', [None])[0]
+        if resource == 'commits' and not rest:
+            # El listado de commits no incluye los archivos modificados
+            listing = [{k: v for k, v in c.items() if k != 'files'} for c in fork['commits']
+                       if not since or c['commit']['committer']['date'] >= since]
+            return self.send_page(listing, query)
+        if resource == 'commits' and len(rest) == 1:
+            commit = fork['commits_by_sha'].get(rest[0])
+            return self.send_commit(commit, query) if commit else self.not_found()
+        if resource == 'issues' and not rest:
+            listing = [i for i in fork['issues'] if not since or i['updated_at'] >= since]
+            return self.send_page(self.sort(listing, query), query)
+        if resource == 'pulls' and not rest:
+            listing = [{k: v for k, v in p.items() if k != 'files'} for p in fork['pulls']]
+            return self.send_page(self.sort(listing, query), query)
+        if resource == 'pulls' and len(rest) == 2 and rest[1] == 'files':
+            pr = fork['pulls_by_number'].get(int(rest[0])) if rest[0].isdigit() else None
+            return self.send_page(pr.get('files', [])[:FILES_LIMIT], query) if pr else self.not_found()
+        if resource == 'contents' and '/'.join(rest) == 'app/modules':
+            names = set()
+            for item in fork['commits'] + fork['pulls']:
+                for file in item.get('files', []):
+                    path = file['filename'].split('/')
+                    if len(path) > 3 and path[:2] == ['app', 'modules']:
+                        names.add(path[2])
+            return self.send_json(200, [{'name': n, 'type': 'dir'} for n in sorted(names)])
+        return self.not_found()
+
+
+# --- Réplica de las consultas GraphQL de github_graphql.py ---
+
+CHANGE_TYPES = {'added': 'ADDED', 'modified': 'MODIFIED', 'removed': 'DELETED',
+                'renamed': 'RENAMED', 'copied': 'COPIED', 'changed': 'CHANGED'}
+
+
+def connection(items, variables, size, to_node):
+    start = int(variables.get('after') or 0)
+    chunk = items[start:start + size]
+    end = start + len(chunk)
+    return {
+        'pageInfo': {'hasNextPage': end < len(items), 'endCursor': str(end)},
+        'nodes': [to_node(item) for item in chunk],
+    }
+
+
+def gql_actor(user):
+    return {'login': user['login']} if user else None
+
+
+def gql_labels(record):
+    return {'nodes': [{'name': label['name']} for label in record.get('labels', [])]}
+
+
+def gql_file(file):
+    return {
+        'path': file['filename'],
+        'additions': file.get('additions', 0),
+        'deletions': file.get('deletions', 0),
+        'changeType': CHANGE_TYPES.get(file.get('status'), 'MODIFIED'),
+    }
+
+
+def gql_commit(commit):
+    def signature(person, user):
+        return {'name': person['name'], 'email': person['email'], 'date': person['date'], 'user': gql_actor(user)}
+
+    return {
+        'oid': commit['sha'],
+        'url': commit.get('html_url'),
+        'message': commit['commit']['message'],
+        'author': signature(commit['commit']['author'], commit.get('author')),
+        'committer': signature(commit['commit']['committer'], commit.get('committer')),
+        'parents': {'nodes': [{'oid': parent['sha']} for parent in commit.get('parents', [])]},
+    }
+
+
+def gql_pull(pr):
+    state = 'OPEN' if pr['state'] == 'open' else ('MERGED' if pr.get('merged_at') else 'CLOSED')
+    files = pr.get('files', [])
+    return {
+        'number': pr['number'],
+        'title': pr['title'],
+        'body': pr.get('body'),
+        'url': pr.get('html_url'),
+        'state': state,
+        'createdAt': pr['created_at'],
+        'updatedAt': pr['updated_at'],
+        'closedAt': pr.get('closed_at'),
+        'mergedAt': pr.get('merged_at'),
+        'author': gql_actor(pr.get('user')),
+        'labels': gql_labels(pr),
+        'headRefName': pr['head']['ref'],
+        'headRefOid': pr['head']['sha'],
+        'baseRefName': pr['base']['ref'],
+        'baseRefOid': pr['base']['sha'],
+        'mergeCommit': {'oid': pr['merge_commit_sha']} if pr.get('merged_at') and pr.get('merge_commit_sha') else None,
+        'changedFiles': len(files),
+        'files': connection(files, {}, 100, gql_file),
+    }
+
+
+def gql_issue(issue):
+    return {
+        'number': issue['number'],
+        'title': issue['title'],
+        'body': issue.get('body'),
+        'url': issue.get('html_url'),
+        'state': issue['state'].upper(),
+        'createdAt': issue['created_at'],
+        'updatedAt': issue['updated_at'],
+        'closedAt': issue.get('closed_at'),
+        'author': gql_actor(issue.get('user')),
+        'labels': gql_labels(issue),
+    }
+
+
+def resolve_commits(fork, variables):
+    since = variables.get('since')
+    commits = [c for c in fork['commits'] if not since or c['commit']['committer']['date'] >= since]
+    history = connection(commits, variables, 100, gql_commit)
+    return {'defaultBranchRef': {'target': {'history': history}}}
+
+
+def resolve_pulls(fork, variables):
+    pulls = sorted(fork['pulls'], key=lambda pr: pr['updated_at'], reverse=True)
+    return {'pullRequests': connection(pulls, variables, 50, gql_pull)}
+
+
+def resolve_pull_files(fork, variables):
+    pr = fork['pulls_by_number'].get(variables.get('number'))
+    if pr is None:
+        return {'pullRequest': None}
+    return {'pullRequest': {'files': connection(pr.get('files', []), variables, 100, gql_file)}}
+
+
+def resolve_issues(fork, variables):
+    since = variables.get('since')
+    issues = [i for i in fork['issues'] if 'pull_request' not in i and (not since or i['updated_at'] >= since)]
+    issues.sort(key=lambda issue: issue['updated_at'], reverse=True)
+    return {'issues': connection(issues, variables, 100, gql_issue)}
+
+
+GRAPHQL_RESOLVERS = {
+    'Commits': resolve_commits,
+    'Pulls': resolve_pulls,
+    'PullFiles': resolve_pull_files,
+    'Issues': resolve_issues,
+}
+
+
+def make_server(data_dir='evaluation', host='127.0.0.1', port=0, latency_ms=0,
+                rate_limit=0, rate_window=3600, fail_rate=0.0):
+    handler = type('Handler', (ReplayHandler,), {
+        'data': ReplayData(data_dir),
+        'latency': latency_ms / 1000,
+        'budgets': ReplayBudgets(rate_limit, rate_window) if rate_limit else None,
+        'fail_rate': fail_rate,
+        'extra_headers': {},
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce respuestas de la API de GitHub desde evaluation/")
+    parser.add_argument('--data', default='evaluation', help="Carpeta con los datos grabados")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=int, default=0, help="Latencia simulada por petición (ms)")
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help="Peticiones permitidas por ventana y token (0 = sin límite)")
+    parser.add_argument('--rate-window', type=int, default=3600, help="Duración de la ventana (s)")
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                        help="Probabilidad de responder con un 502 transitorio")
+    args = parser.parse_args()
+
+    server = make_server(args.data, args.host, args.port, args.latency,
+                         args.rate_limit, args.rate_window, args.fail_rate)
+    logging.info(f"✅ Servidor de replay en http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
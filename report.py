@@ -0,0 +1,78 @@
+import time
+import argparse
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from feedback_store import BUCKETS
+from report_data import ReportData
+
+# Genera todas las figuras en un solo proceso: los logs, los cubos y las tablas
+# compartidas se cargan una vez (ReportData) y cada gráfica se dibuja con el
+# render(data) de su script. Con --jobs se reparten entre varios procesos,
+# cada uno con su propio ReportData. Las figuras cuyos datos no han cambiado
+# se conservan (figure_cache.py); --force las vuelve a dibujar todas. --bucket
+# cambia el intervalo de las series temporales (mes por defecto).
+
+# Scripts de gráficas, en el orden en que se generan
+CHARTS = (
+    'evaluation_05_feedback_analysis_graphs',
+    'evaluation_06_heatmap_graph',
+    'feature_introduction_timeline',
+    'feature_tag_evolution_over_time',
+    'graph_feature_stacked_activity_over_time',
+    'tag_evolution',
+    'tag_evolution_accross_all_features',
+    'top_n_features',
+)
+
+# Datos del proceso de trabajo cuando se usa --jobs
+worker_data = None
+
+
+def render_chart(name, data):
+    start = time.perf_counter()
+    importlib.import_module(name).render(data)
+    # Algunas gráficas dejan figuras abiertas; no deben pasar a la siguiente
+    plt.close('all')
+    return time.perf_counter() - start
+
+
+def init_worker(force, bucket):
+    global worker_data
+    worker_data = ReportData(force, bucket)
+
+
+def render_in_worker(name):
+    return render_chart(name, worker_data)
+
+
+def build_report(charts=CHARTS, jobs=1, force=False, bucket='month'):
+    start = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(force, bucket)) as pool:
+            timings = list(zip(charts, pool.map(render_in_worker, charts)))
+    else:
+        data = ReportData(force, bucket)
+        timings = [(name, render_chart(name, data)) for name in charts]
+
+    print("\n⏱️  Tiempo por gráfica:")
+    for name, seconds in timings:
+        print(f"   {name}: {seconds:.2f}s")
+    print(f"✅ Informe generado: {len(timings)} gráficas en {time.perf_counter() - start:.2f}s")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera todas las figuras del informe a partir del feedback log")
+    parser.add_argument('--charts', nargs='+', choices=CHARTS, default=CHARTS, help="Gráficas a generar (todas por defecto)")
+    parser.add_argument('--jobs', type=int, default=1, help="Procesos que dibujan gráficas en paralelo")
+    parser.add_argument('--force', action='store_true', help="Dibuja todas las figuras aunque sus datos no hayan cambiado")
+    parser.add_argument('--bucket', choices=BUCKETS, default='month', help="Intervalo de las series temporales")
+    args = parser.parse_args()
+    build_report(args.charts, max(1, args.jobs), args.force, args.bucket)
+
+
+if __name__ == '__main__':
+    main()
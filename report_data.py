@@ -0,0 +1,59 @@
+import os
+from feedback_store import load_feedback_log, BUCKET_LABELS, BUCKET_FORMATS
+from feedback_cube import FeedbackCube, load_feedback_cube
+from figure_cache import FigureCache
+
+FEEDBACK_LOG = "feedback_log.json"
+ANONYMOUS_LOG = "feedback_log_anonymous.json"
+
+
+# Datos compartidos por las gráficas: cada log, su cubo y las tablas derivadas
+# se cargan o calculan una sola vez y se reutilizan en todas las que los piden.
+# Cada script de gráficas expone render(data); ejecutado solo crea su propio
+# ReportData, y report.py pasa el mismo a todas. figures es la caché de
+# figuras: las que no han cambiado no se vuelven a dibujar. bucket es el
+# intervalo de las series temporales (day, week, sprint o month).
+class ReportData:
+    def __init__(self, force=False, bucket='month'):
+        self.cache = {}
+        self.figures = FigureCache(force=force or os.getenv('FIGURE_CACHE') == '0')
+        self.bucket = bucket
+
+    @property
+    def bucket_label(self):
+        return BUCKET_LABELS[self.bucket]
+
+    @property
+    def bucket_format(self):
+        return BUCKET_FORMATS[self.bucket]
+
+    def shared(self, key, build):
+        if key not in self.cache:
+            self.cache[key] = build()
+        return self.cache[key]
+
+    def log(self, path=FEEDBACK_LOG):
+        return self.shared(('log', path), lambda: load_feedback_log(path))
+
+    # Cubo con el intervalo del informe: el mensual se lee de disco y el resto
+    # se calcula a partir del log
+    def cube(self, path=FEEDBACK_LOG):
+        if self.bucket == 'month':
+            return self.shared(('cube', path), lambda: load_feedback_cube(path))
+        return self.shared(('cube', path, self.bucket), lambda: FeedbackCube.from_log(self.log(path), self.bucket))
+
+    # DataFrame del log (timestamps ya convertidos a fecha)
+    def frame(self, path=FEEDBACK_LOG):
+        return self.shared(('frame', path), lambda: self.log(path).to_frame())
+
+    # Tabla index × columns del cubo, como pivot_table
+    def pivot(self, index, columns, path=FEEDBACK_LOG):
+        return self.shared(('pivot', path, self.bucket, index, columns), lambda: self.cube(path).frame(index, columns))
+
+    # {outer: Counter({inner: cuentas})} del cubo
+    def counters(self, outer, inner, path=FEEDBACK_LOG):
+        return self.shared(('counters', path, self.bucket, outer, inner), lambda: self.cube(path).counters(outer, inner))
+
+    # Total de entradas por feature, de mayor a menor (empates en orden de aparición)
+    def feature_totals(self, path=FEEDBACK_LOG):
+        return self.shared(('feature_totals', path), lambda: self.cube(path).rollup('feature').sort_values(ascending=False, kind='stable'))
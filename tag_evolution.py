@@ -1,14 +1,9 @@
-import json
 import os
 from collections import defaultdict, Counter
-from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import pandas as pd
-
-# Cargar el feedback log
-with open("feedback_log.json") as f:
-    feedback_log = json.load(f)
+from report_data import ReportData
 
 # Definir grupos de tags semánticos
 TAG_GROUPS = {
@@ -20,32 +15,42 @@ TAG_GROUPS = {
     "Obsolete": {"obsolete"},
 }
 
-# Contador por mes y grupo
-group_time_series = defaultdict(Counter)
-
-# Procesar el feedback log
-for feature, source, tag, fork, timestamp in feedback_log:
-    dt = datetime.fromisoformat(timestamp)
-    month_str = dt.strftime("%Y-%m")
-    for group, tag_set in TAG_GROUPS.items():
-        if tag in tag_set:
-            group_time_series[group][month_str] += 1
-
-# Crear DataFrame y ordenarlo
-df = pd.DataFrame(group_time_series).fillna(0).sort_index()
-df.index = pd.to_datetime(df.index)
-
-# Graficar área
-plt.figure(figsize=(14, 7))
-df.plot.area(colormap='Greys', linewidth=0, alpha=0.9)
-plt.title("Semantic Activity Evolution Over Time")
-plt.xlabel("Time")
-plt.ylabel("Occurrences")
-plt.xticks(rotation=45)
-plt.tight_layout()
-
-# Guardar en PNG y SVG
-os.makedirs("figures", exist_ok=True)
-plt.savefig("figures/semantic_activity_evolution.svg", format='svg')
-plt.savefig("figures/semantic_activity_evolution.png", format='png')
-plt.close()
+
+def render(data):
+    # Contador por mes y grupo
+    group_time_series = defaultdict(Counter)
+
+    # Procesar las cuentas por (tag, intervalo de tiempo)
+    (tags, periods), counts = data.cube().group('tag', data.bucket)
+    for tag, period, count in zip(tags, periods, counts.tolist()):
+        for group, tag_set in TAG_GROUPS.items():
+            if tag in tag_set:
+                group_time_series[group][period] += count
+
+    # Crear DataFrame y ordenarlo
+    df = pd.DataFrame(group_time_series).fillna(0).sort_index()
+    df.index = pd.to_datetime(df.index)
+
+    key = data.figures.key(__file__, df)
+    if data.figures.fresh("semantic_activity_evolution", key):
+        return
+
+    # Graficar área
+    plt.figure(figsize=(14, 7))
+    df.plot.area(colormap='Greys', linewidth=0, alpha=0.9)
+    plt.title("Semantic Activity Evolution Over Time")
+    plt.xlabel("Time")
+    plt.ylabel("Occurrences")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+    # Guardar en PNG y SVG
+    os.makedirs("figures", exist_ok=True)
+    plt.savefig("figures/semantic_activity_evolution.svg", format='svg')
+    plt.savefig("figures/semantic_activity_evolution.png", format='png')
+    plt.close()
+    data.figures.store("semantic_activity_evolution", key)
+
+
+if __name__ == '__main__':
+    render(ReportData())
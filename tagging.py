@@ -0,0 +1,75 @@
+import re
+
+# Palabras clave por tipo de tag
+KEYWORDS = {
+    'testing': ['test', 'testing', 'ci', 'unit', 'integration'],
+    'fix': ['fix', 'bug', 'error', 'fail'],
+    'mock': ['mock', 'stub'],
+    'config': ['config', 'configuration', 'setup'],
+    'model': ['model', 'schema'],
+    'extension': ['extend', 'extension', 'feature'],
+    'refactor': ['refactor', 'restructure'],
+    'obsolete': ['obsolete', 'deprecated', 'remove']
+}
+
+
+# Expresión regular que reconoce todas las palabras clave, agrupadas en un
+# árbol de prefijos para que el motor no pruebe cada alternativa por separado
+# ('test' y 'testing' pasan a ser test(?:ing)?)
+def trie_pattern(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f'(?:{body})?' if end else body
+
+    return build(trie)
+
+
+# Extractor de tags en una sola pasada: una única expresión regular compilada
+# a partir de KEYWORDS en lugar de buscar cada palabra clave por separado.
+#
+# Por defecto se comporta como la búsqueda original por subcadenas ('ci'
+# aparece en "decision"). Con word_boundary=True la palabra clave tiene que
+# empezar una palabra, pero puede llevar detrás cualquier terminación
+# ("tests", "fixed", "bugs" siguen contando; "decision" ya no)
+class TagMatcher:
+    def __init__(self, keywords=KEYWORDS, word_boundary=False):
+        self.word_boundary = word_boundary
+        words = {word.lower() for tag_words in keywords.values() for word in tag_words}
+        tags_by_word = {word: {tag for tag, tag_words in keywords.items() if word in tag_words}
+                        for word in words}
+        # En cada posición el árbol encuentra la palabra clave más larga; las
+        # que son prefijo suyo también aparecen ahí ('testing' implica 'test')
+        self.tags = {word: set().union(*(tags_by_word[w] for w in words if word.startswith(w)))
+                     for word in words}
+        if word_boundary:
+            # Solo al principio de una palabra: una coincidencia por palabra
+            self.pattern = re.compile(rf'\b({trie_pattern(words)})\w*')
+        else:
+            self.pattern = re.compile(f'(?=({trie_pattern(words)}))')
+        self.all_tags = set(keywords)
+
+    def extract(self, text):
+        tags = set()
+        for match in self.pattern.finditer(text.lower()):
+            tags |= self.tags[match.group(1)]
+            if len(tags) == len(self.all_tags):
+                break
+        return tags
+
+
+_default_matcher = TagMatcher()
+
+
+def extract_tags(text):
+    return _default_matcher.extract(text)
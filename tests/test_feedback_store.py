@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feedback_store import FeedbackLog, FeedbackTable, parse_timestamp, parse_timestamps, write_table
+
+NOV_1_UTC = 1730419200
+DEC_1_UTC = 1733011200
+
+
+# Zona horaria de la máquina distinta de UTC mientras dura el test
+@pytest.fixture
+def madrid_tz():
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = 'Europe/Madrid'
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ['TZ']
+    else:
+        os.environ['TZ'] = previous
+    time.tzset()
+
+
+def test_naive_timestamps_are_utc(madrid_tz):
+    assert parse_timestamp('2024-11-01') == NOV_1_UTC
+    assert parse_timestamp('2024-11-01T00:00:00') == NOV_1_UTC
+    assert parse_timestamp('2024-11-01T00:00:00Z') == NOV_1_UTC
+    assert parse_timestamp('2024-11-01T01:00:00+01:00') == NOV_1_UTC
+
+
+def test_fast_and_slow_paths_agree(madrid_tz):
+    fast = parse_timestamps(['2024-11-01T00:00:00Z', '2024-12-01T00:00:00Z'])
+    slow = parse_timestamps(['2024-11-01T00:00:00', '2024-12-01T00:00:00'])
+    assert fast.tolist() == slow.tolist() == [NOV_1_UTC, DEC_1_UTC]
+
+
+def test_select_with_naive_bounds(madrid_tz, tmp_path):
+    log = FeedbackLog.from_rows([
+        ['auth', 'commit', 'fix', 'fork', '2024-10-31T23:30:00Z'],
+        ['auth', 'commit', 'fix', 'fork', '2024-11-01T00:30:00Z'],
+        ['auth', 'commit', 'fix', 'fork', '2024-11-30T23:30:00Z'],
+        ['auth', 'commit', 'fix', 'fork', '2024-12-01T00:30:00Z'],
+    ])
+    table_file, index_file = str(tmp_path / 'log.table.npy'), str(tmp_path / 'log.index.json')
+    write_table(log, table_file, index_file)
+    rows = FeedbackTable(table_file, index_file).select('fork', '2024-11-01', '2024-12-01')
+    assert rows['timestamp'].tolist() == [NOV_1_UTC + 1800, DEC_1_UTC - 1800]